@@ -1,6 +1,7 @@
 #pragma once
 
 #include <cstdint>
+#include <cstddef>
 #include <array>
 #include <string.h>
 #include <type_traits>
@@ -11,8 +12,119 @@ namespace detail
 {
 template<typename T>
 constexpr bool is_small_integral = std::is_integral_v<T> && sizeof(T) <= 4;
+
+#if defined(__BYTE_ORDER__) && defined(__ORDER_BIG_ENDIAN__)
+constexpr bool is_little_endian = __BYTE_ORDER__ != __ORDER_BIG_ENDIAN__;
+#else
+constexpr bool is_little_endian = true;
+#endif
+
+// CODEC_HAS_IS_CONSTANT_EVALUATED tells if coders can tell constant evaluation from run time.
+// Without it they always take constexpr-friendly path, so memcpy is never used and instrumentation cannot work.
+#if defined(__cpp_lib_is_constant_evaluated)
+#define CODEC_HAS_IS_CONSTANT_EVALUATED 1
+constexpr bool is_constant_evaluated() { return std::is_constant_evaluated(); }
+#elif defined(_MSC_VER) && _MSC_VER >= 1925
+#define CODEC_HAS_IS_CONSTANT_EVALUATED 1
+constexpr bool is_constant_evaluated() { return __builtin_is_constant_evaluated(); }
+#elif defined(__has_builtin)
+#if __has_builtin(__builtin_is_constant_evaluated)
+#define CODEC_HAS_IS_CONSTANT_EVALUATED 1
+constexpr bool is_constant_evaluated() { return __builtin_is_constant_evaluated(); }
+#endif
+#endif
+#if !defined(CODEC_HAS_IS_CONSTANT_EVALUATED)
+#define CODEC_HAS_IS_CONSTANT_EVALUATED 0
+constexpr bool is_constant_evaluated() { return true; }
+#endif
+
+// Byte order is handled with shifts instead of reinterpret_cast, so that it can be used in constant expressions
+template<typename T>
+constexpr std::uint8_t* store_le(T data, std::uint8_t* buffer)
+{
+    auto x = static_cast<std::make_unsigned_t<T>>(data);
+    for(std::size_t i = 0; i < sizeof(T); ++i)
+    {
+        buffer[i] = static_cast<std::uint8_t>(x >> (8 * i));
+    }
+    return buffer + sizeof(T);
+}
+
+template<typename T>
+constexpr std::uint8_t* store_be(T data, std::uint8_t* buffer)
+{
+    auto x = static_cast<std::make_unsigned_t<T>>(data);
+    for(std::size_t i = 0; i < sizeof(T); ++i)
+    {
+        buffer[sizeof(T) - 1 - i] = static_cast<std::uint8_t>(x >> (8 * i));
+    }
+    return buffer + sizeof(T);
 }
 
+template<typename T>
+constexpr std::uint8_t* store_native(T data, std::uint8_t* buffer)
+{
+    if constexpr (is_little_endian)
+        return store_le(data, buffer);
+    else
+        return store_be(data, buffer);
+}
+
+template<typename T>
+constexpr const std::uint8_t* load_le(T& data, const std::uint8_t* buffer)
+{
+    std::make_unsigned_t<T> x = 0;
+    for(std::size_t i = 0; i < sizeof(T); ++i)
+    {
+        x |= static_cast<std::make_unsigned_t<T>>(buffer[i]) << (8 * i);
+    }
+    data = static_cast<T>(x);
+    return buffer + sizeof(T);
+}
+
+template<typename T>
+constexpr const std::uint8_t* load_be(T& data, const std::uint8_t* buffer)
+{
+    std::make_unsigned_t<T> x = 0;
+    for(std::size_t i = 0; i < sizeof(T); ++i)
+    {
+        x |= static_cast<std::make_unsigned_t<T>>(buffer[sizeof(T) - 1 - i]) << (8 * i);
+    }
+    data = static_cast<T>(x);
+    return buffer + sizeof(T);
+}
+
+template<typename T>
+constexpr const std::uint8_t* load_native(T& data, const std::uint8_t* buffer)
+{
+    if constexpr (is_little_endian)
+        return load_le(data, buffer);
+    else
+        return load_be(data, buffer);
+}
+
+// Copies bytes in natural or reversed order; memcpy is used only outside of constant evaluation
+constexpr void copy_bytes(std::uint8_t* destination, const std::uint8_t* source, std::size_t size)
+{
+    if(!is_constant_evaluated())
+    {
+        memcpy(destination, source, size);
+        return;
+    }
+    for(std::size_t i = 0; i < size; ++i)
+    {
+        destination[i] = source[i];
+    }
+}
+}
+
+// Byte order of encoded data, native is byte order of host
+enum class endian
+{
+    little,
+    big,
+    native = detail::is_little_endian ? little : big
+};
 
 // Arrays of partbyte are treated as big integer that needs reverse byte order in big endian
 struct partbyte
@@ -25,326 +137,594 @@ struct partbyte
     partbyte& operator=(const partbyte&) = default;
     partbyte& operator=(partbyte&&) = default;
 
-    partbyte(uint8_t x) : v{ x } {}
-    partbyte& operator=(uint8_t x) { v = x; return *this; }
+    constexpr partbyte(uint8_t x) : v{ x } {}
+    constexpr partbyte& operator=(uint8_t x) { v = x; return *this; }
 
-    operator uint8_t () const { return v; }
+    constexpr operator uint8_t () const { return v; }
 	
-	bool operator==(partbyte x) const { return v == x.v; }
-	bool operator!=(partbyte x) const { return v != x.v; }
-	bool operator< (partbyte x) const { return v <  x.v; }
-	bool operator<=(partbyte x) const { return v <= x.v; }
-	bool operator> (partbyte x) const { return v >  x.v; }
-	bool operator>=(partbyte x) const { return v >= x.v; }
+	constexpr bool operator==(partbyte x) const { return v == x.v; }
+	constexpr bool operator!=(partbyte x) const { return v != x.v; }
+	constexpr bool operator< (partbyte x) const { return v <  x.v; }
+	constexpr bool operator<=(partbyte x) const { return v <= x.v; }
+	constexpr bool operator> (partbyte x) const { return v >  x.v; }
+	constexpr bool operator>=(partbyte x) const { return v >= x.v; }
 };
 
-inline std::uint8_t* encode(std::uint8_t data, std::uint8_t* buffer)
+// Number of bytes type occupies in encoded buffer.
+// Generated structures provide it as static member wireSize.
+template<typename T, typename = void>
+struct wire_size
 {
-    buffer[0] = data;
-    return buffer + 1;
+    static constexpr std::size_t value = T::wireSize;
+};
+
+template<typename T>
+struct wire_size<T, std::enable_if_t<std::is_integral_v<T>>>
+{
+    static constexpr std::size_t value = sizeof(T);
+};
+
+template<>
+struct wire_size<partbyte>
+{
+    static constexpr std::size_t value = 1;
+};
+
+template<typename T, std::size_t N>
+struct wire_size<std::array<T, N>>
+{
+    static constexpr std::size_t value = N * wire_size<T>::value;
+};
+
+template<typename T>
+constexpr std::size_t wire_size_v = wire_size<T>::value;
+
+// Structures generated for single wire byte order provide it as static member wireEndianness.
+// They have only encode/decode pair, which codes in that byte order.
+template<typename T, typename = void>
+constexpr bool has_wire_endianness_v = false;
+
+template<typename T>
+constexpr bool has_wire_endianness_v<T, std::void_t<decltype(T::wireEndianness)>> = true;
+
+// Elements of arrays are coded through these, so arrays of structures generated for single byte order work too
+template<typename T>
+constexpr std::uint8_t* encode_any(const T& data, std::uint8_t* buffer);
+template<typename T>
+constexpr const std::uint8_t* decode_any(T& data, const std::uint8_t* buffer);
+template<typename T>
+constexpr std::uint8_t* encode_any_be(const T& data, std::uint8_t* buffer);
+template<typename T>
+constexpr const std::uint8_t* decode_any_be(T& data, const std::uint8_t* buffer);
+template<typename T>
+constexpr std::uint8_t* encode_any_le(const T& data, std::uint8_t* buffer);
+template<typename T>
+constexpr const std::uint8_t* decode_any_le(T& data, const std::uint8_t* buffer);
+
+constexpr std::uint8_t* encode(std::uint8_t data, std::uint8_t* buffer)
+{
+    return detail::store_native(data, buffer);
 }
 
-inline std::uint8_t* encode(std::int8_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(partbyte data, std::uint8_t* buffer)
 {
-    buffer[0] = *reinterpret_cast<std::uint8_t*>(&data);
+    buffer[0] = data.v;
     return buffer + 1;
 }
 
-inline std::uint8_t* encode(std::uint16_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(std::int8_t data, std::uint8_t* buffer)
+{
+    return detail::store_native(data, buffer);
+}
+
+constexpr std::uint8_t* encode(std::uint16_t data, std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    buffer[0] = *x;
-    buffer[1] = *(x + 1);
-    return buffer + 2;
+    return detail::store_native(data, buffer);
 }
 
-inline std::uint8_t* encode(std::int16_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(std::int16_t data, std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    buffer[0] = *x;
-    buffer[1] = *(x + 1);
-    return buffer + 2;
+    return detail::store_native(data, buffer);
 }
 
-inline std::uint8_t* encode(std::uint32_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(std::uint32_t data, std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    memcpy(buffer, x, 4);
-    return buffer + 4;
+    return detail::store_native(data, buffer);
 }
 
-inline std::uint8_t* encode(std::int32_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(std::int32_t data, std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    memcpy(buffer, x, 4);
-    return buffer + 4;
+    return detail::store_native(data, buffer);
 }
 
 template<typename T, std::size_t N, std::enable_if_t<!detail::is_small_integral<T>, int> = 0>
-inline std::uint8_t* encode(const std::array<T, N>& data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(const std::array<T, N>& data, std::uint8_t* buffer)
 {
-    for(auto x: data)
+    for(const auto& x: data)
     {
-        buffer = encode(x, buffer);
+        buffer = encode_any(x, buffer);
     }
     return buffer;
 }
 
 template<typename T, std::size_t N, std::enable_if_t<detail::is_small_integral<T>, int> = 0>
-inline std::uint8_t* encode(const std::array<T, N>& data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(const std::array<T, N>& data, std::uint8_t* buffer)
 {
-    memcpy(buffer, data.data(), N * sizeof(T));
-    return buffer + N * sizeof(T);
+    if(!detail::is_constant_evaluated())
+    {
+        memcpy(buffer, data.data(), N * sizeof(T));
+        return buffer + N * sizeof(T);
+    }
+    for(auto x: data)
+    {
+        buffer = encode(x, buffer);
+    }
+    return buffer;
 }
 
 template<std::size_t N>
-inline std::uint8_t* encode(const std::array<partbyte, N>& data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode(const std::array<partbyte, N>& data, std::uint8_t* buffer)
 {
-    memcpy(buffer, data.data(), N);
+    for(std::size_t i = 0; i < N; ++i)
+    {
+        buffer[i] = data[i];
+    }
     return buffer + N;
 }
 
 template<typename T>
-inline std::uint8_t* encode_any(const T& data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode_any(const T& data, std::uint8_t* buffer)
 {
+    if constexpr (has_wire_endianness_v<T>)
+    {
+        // Arrays of partbyte are not reversed in native order, so it matches little endian only on little endian hosts
+        static_assert(T::wireEndianness == endian::little && endian::native == endian::little,
+            "Structure is generated for other byte order, use encode_any_be or encode_any_le");
+    }
     return encode(data, buffer); // Hopes to find correct function with ADL
 }
 
 // ================================================================ //
 // ================================================================ //
 
-inline const std::uint8_t* decode(std::uint8_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::uint8_t& data, const std::uint8_t* buffer)
 {
-    data = buffer[0];
-    return buffer + 1;
+    return detail::load_native(data, buffer);
 }
 
-inline const std::uint8_t* decode(std::int8_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(partbyte& data, const std::uint8_t* buffer)
 {
-    data = *reinterpret_cast<const std::int8_t*>(&buffer[0]);
+    data.v = buffer[0];
     return buffer + 1;
 }
 
-inline const std::uint8_t* decode(std::uint16_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::int8_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    *x = buffer[0];
-    *(x + 1) = buffer[1];
-    return buffer + 2;
+    return detail::load_native(data, buffer);
 }
 
-inline const std::uint8_t* decode(std::int16_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::uint16_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    *x = buffer[0];
-    *(x + 1) = buffer[1];
-    return buffer + 2;
+    return detail::load_native(data, buffer);
 }
 
-inline const std::uint8_t* decode(std::uint32_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::int16_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    memcpy(x, buffer, 4);
-    return buffer + 4;
+    return detail::load_native(data, buffer);
 }
 
-inline const std::uint8_t* decode(std::int32_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::uint32_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    memcpy(x, buffer, 4);
-    return buffer + 4;
+    return detail::load_native(data, buffer);
+}
+
+constexpr const std::uint8_t* decode(std::int32_t& data, const std::uint8_t* buffer)
+{
+    return detail::load_native(data, buffer);
 }
 
 template<typename T, std::size_t N, std::enable_if_t<!detail::is_small_integral<T>, int> = 0>
-inline const std::uint8_t* decode(std::array<T, N>& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::array<T, N>& data, const std::uint8_t* buffer)
 {
     for(T& x: data)
     {
-        buffer = decode(x, buffer);
+        buffer = decode_any(x, buffer);
     }
     return buffer;
 }
 
 template<typename T, std::size_t N, std::enable_if_t<detail::is_small_integral<T>, int> = 0>
-inline const std::uint8_t* decode(std::array<T, N>& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::array<T, N>& data, const std::uint8_t* buffer)
 {
-    memcpy(data.data(), buffer, N * sizeof(T));
-    return buffer + N * sizeof(T);
+    if(!detail::is_constant_evaluated())
+    {
+        memcpy(data.data(), buffer, N * sizeof(T));
+        return buffer + N * sizeof(T);
+    }
+    for(T& x: data)
+    {
+        buffer = decode(x, buffer);
+    }
+    return buffer;
 }
 
 template<std::size_t N>
-inline const std::uint8_t* decode(std::array<partbyte, N>& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode(std::array<partbyte, N>& data, const std::uint8_t* buffer)
 {
-    memcpy(data.data(), buffer, N);
+    for(std::size_t i = 0; i < N; ++i)
+    {
+        data[i] = buffer[i];
+    }
     return buffer + N;
 }
 
 template<typename T>
-inline const std::uint8_t* decode_any(T& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_any(T& data, const std::uint8_t* buffer)
 {
+    if constexpr (has_wire_endianness_v<T>)
+    {
+        static_assert(T::wireEndianness == endian::little && endian::native == endian::little,
+            "Structure is generated for other byte order, use decode_any_be or decode_any_le");
+    }
     return decode(data, buffer); // Hopes to find correct function with ADL
 }
 
 // ================================================================ //
 // ================================================================ //
 
-inline std::uint8_t* encode_be(std::uint8_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode_be(std::uint8_t data, std::uint8_t* buffer)
 {
-    buffer[0] = data;
+    return detail::store_be(data, buffer);
+}
+
+constexpr std::uint8_t* encode_be(partbyte data, std::uint8_t* buffer)
+{
+    buffer[0] = data.v;
     return buffer + 1;
 }
 
-inline std::uint8_t* encode_be(std::int8_t data, std::uint8_t* buffer)
+constexpr std::uint8_t* encode_be(std::int8_t data, std::uint8_t* buffer)
+{
+    return detail::store_be(data, buffer);
+}
+
+constexpr std::uint8_t* encode_be(std::uint16_t data, std::uint8_t* buffer)
+{
+    return detail::store_be(data, buffer);
+}
+
+constexpr std::uint8_t* encode_be(std::int16_t data, std::uint8_t* buffer)
+{
+    return detail::store_be(data, buffer);
+}
+
+constexpr std::uint8_t* encode_be(std::uint32_t data, std::uint8_t* buffer)
+{
+    return detail::store_be(data, buffer);
+}
+
+constexpr std::uint8_t* encode_be(std::int32_t data, std::uint8_t* buffer)
 {
-    buffer[0] = *reinterpret_cast<std::uint8_t*>(&data);
+    return detail::store_be(data, buffer);
+}
+
+template<typename T, std::size_t N>
+constexpr std::uint8_t* encode_be(const std::array<T, N>& data, std::uint8_t* buffer)
+{
+    for (const auto& x : data)
+    {
+        buffer = encode_any_be(x, buffer);
+    }
+    return buffer;
+}
+
+template<std::size_t N>
+constexpr std::uint8_t* encode_be(const std::array<std::uint8_t, N>& data, std::uint8_t* buffer)
+{
+    detail::copy_bytes(buffer, data.data(), N);
+    return buffer + N;
+}
+
+template<std::size_t N>
+constexpr std::uint8_t* encode_be(const std::array<partbyte, N>& data, std::uint8_t* buffer)
+{
+    for (std::size_t i = 0; i < N; ++i)
+    {
+        buffer[i] = data[N - 1 - i];
+    }
+    return buffer + N;
+}
+
+template<typename T>
+constexpr std::uint8_t* encode_any_be(const T& data, std::uint8_t* buffer)
+{
+    if constexpr (has_wire_endianness_v<T>)
+    {
+        static_assert(T::wireEndianness == endian::big, "Structure is generated only for little endian");
+        return encode(data, buffer);
+    }
+    else
+    {
+        return encode_be(data, buffer); // Hopes to find correct function with ADL
+    }
+}
+
+// ================================================================ //
+// ================================================================ //
+
+constexpr const std::uint8_t* decode_be(std::uint8_t& data, const std::uint8_t* buffer)
+{
+    return detail::load_be(data, buffer);
+}
+
+constexpr const std::uint8_t* decode_be(partbyte& data, const std::uint8_t* buffer)
+{
+    data.v = buffer[0];
     return buffer + 1;
 }
 
-inline std::uint8_t* encode_be(std::uint16_t data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::int8_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    buffer[0] = *(x + 1);
-    buffer[1] = *(x + 0);
-    return buffer + 2;
+    return detail::load_be(data, buffer);
 }
 
-inline std::uint8_t* encode_be(std::int16_t data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::uint16_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    buffer[0] = *(x + 1);
-    buffer[1] = *(x + 0);
-    return buffer + 2;
+    return detail::load_be(data, buffer);
 }
 
-inline std::uint8_t* encode_be(std::uint32_t data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::int16_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    buffer[0] = *(x + 3);
-    buffer[1] = *(x + 2);
-    buffer[2] = *(x + 1);
-    buffer[3] = *(x + 0);
-    return buffer + 4;
+    return detail::load_be(data, buffer);
 }
 
-inline std::uint8_t* encode_be(std::int32_t data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::uint32_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    buffer[0] = *(x + 3);
-    buffer[1] = *(x + 2);
-    buffer[2] = *(x + 1);
-    buffer[3] = *(x + 0);
-    return buffer + 4;
+    return detail::load_be(data, buffer);
+}
+
+constexpr const std::uint8_t* decode_be(std::int32_t& data, const std::uint8_t* buffer)
+{
+    return detail::load_be(data, buffer);
 }
 
 template<typename T, std::size_t N>
-inline std::uint8_t* encode_be(const std::array<T, N>& data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::array<T, N>& data, const std::uint8_t* buffer)
 {
-    for (auto x : data)
+    for (T& x : data)
     {
-        buffer = encode_be(x, buffer);
+        buffer = decode_any_be(x, buffer);
     }
     return buffer;
 }
 
 template<std::size_t N>
-inline std::uint8_t* encode_be(const std::array<std::uint8_t, N>& data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::array<std::uint8_t, N>& data, const std::uint8_t* buffer)
 {
-    memcpy(buffer, data.data(), N);
+    detail::copy_bytes(data.data(), buffer, N);
     return buffer + N;
 }
 
 template<std::size_t N>
-inline std::uint8_t* encode_be(const std::array<partbyte, N>& data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_be(std::array<partbyte, N>& data, const std::uint8_t* buffer)
 {
-    std::copy(data.rbegin(), data.rend(), buffer);
+    for (std::size_t i = 0; i < N; ++i)
+    {
+        data[N - 1 - i] = buffer[i];
+    }
     return buffer + N;
 }
 
 template<typename T>
-inline std::uint8_t* encode_any_be(const T& data, std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_any_be(T& data, const std::uint8_t* buffer)
 {
-    return encode_be(data, buffer); // Hopes to find correct function with ADL
+    if constexpr (has_wire_endianness_v<T>)
+    {
+        static_assert(T::wireEndianness == endian::big, "Structure is generated only for little endian");
+        return decode(data, buffer);
+    }
+    else
+    {
+        return decode_be(data, buffer); // Hopes to find correct function with ADL
+    }
 }
 
 // ================================================================ //
 // ================================================================ //
 
-inline const std::uint8_t* decode_be(std::uint8_t& data, const std::uint8_t* buffer)
+constexpr std::uint8_t* encode_le(std::uint8_t data, std::uint8_t* buffer)
 {
-    data = buffer[0];
+    return detail::store_le(data, buffer);
+}
+
+constexpr std::uint8_t* encode_le(partbyte data, std::uint8_t* buffer)
+{
+    buffer[0] = data.v;
     return buffer + 1;
 }
 
-inline const std::uint8_t* decode_be(std::int8_t& data, const std::uint8_t* buffer)
+constexpr std::uint8_t* encode_le(std::int8_t data, std::uint8_t* buffer)
+{
+    return detail::store_le(data, buffer);
+}
+
+constexpr std::uint8_t* encode_le(std::uint16_t data, std::uint8_t* buffer)
+{
+    return detail::store_le(data, buffer);
+}
+
+constexpr std::uint8_t* encode_le(std::int16_t data, std::uint8_t* buffer)
+{
+    return detail::store_le(data, buffer);
+}
+
+constexpr std::uint8_t* encode_le(std::uint32_t data, std::uint8_t* buffer)
+{
+    return detail::store_le(data, buffer);
+}
+
+constexpr std::uint8_t* encode_le(std::int32_t data, std::uint8_t* buffer)
 {
-    data = *reinterpret_cast<const std::int8_t*>(&buffer[0]);
+    return detail::store_le(data, buffer);
+}
+
+template<typename T, std::size_t N>
+constexpr std::uint8_t* encode_le(const std::array<T, N>& data, std::uint8_t* buffer)
+{
+    for (const auto& x : data)
+    {
+        buffer = encode_any_le(x, buffer);
+    }
+    return buffer;
+}
+
+template<std::size_t N>
+constexpr std::uint8_t* encode_le(const std::array<std::uint8_t, N>& data, std::uint8_t* buffer)
+{
+    detail::copy_bytes(buffer, data.data(), N);
+    return buffer + N;
+}
+
+template<std::size_t N>
+constexpr std::uint8_t* encode_le(const std::array<partbyte, N>& data, std::uint8_t* buffer)
+{
+    for (std::size_t i = 0; i < N; ++i)
+    {
+        buffer[i] = data[i];
+    }
+    return buffer + N;
+}
+
+// Generated structures without wireEndianness have no encode_le,
+// so on big endian hosts only primitives, arrays and little endian structures can be coded
+template<typename T>
+constexpr std::uint8_t* encode_any_le(const T& data, std::uint8_t* buffer)
+{
+    if constexpr (has_wire_endianness_v<T>)
+    {
+        static_assert(T::wireEndianness == endian::little, "Structure is generated only for big endian");
+        return encode(data, buffer);
+    }
+    else if constexpr (endian::native == endian::little)
+    {
+        return encode(data, buffer); // Same bytes as native coding, which has memcpy fast paths
+    }
+    else
+    {
+        return encode_le(data, buffer); // Hopes to find correct function with ADL
+    }
+}
+
+// ================================================================ //
+// ================================================================ //
+
+constexpr const std::uint8_t* decode_le(std::uint8_t& data, const std::uint8_t* buffer)
+{
+    return detail::load_le(data, buffer);
+}
+
+constexpr const std::uint8_t* decode_le(partbyte& data, const std::uint8_t* buffer)
+{
+    data.v = buffer[0];
     return buffer + 1;
 }
 
-inline const std::uint8_t* decode_be(std::uint16_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::int8_t& data, const std::uint8_t* buffer)
+{
+    return detail::load_le(data, buffer);
+}
+
+constexpr const std::uint8_t* decode_le(std::uint16_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    *(x + 1) = buffer[0];
-    *(x + 0) = buffer[1];
-    return buffer + 2;
+    return detail::load_le(data, buffer);
 }
 
-inline const std::uint8_t* decode_be(std::int16_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::int16_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    *(x + 1) = buffer[0];
-    *(x + 0) = buffer[1];
-    return buffer + 2;
+    return detail::load_le(data, buffer);
 }
 
-inline const std::uint8_t* decode_be(std::uint32_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::uint32_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    *(x + 3) = buffer[0];
-    *(x + 2) = buffer[1];
-    *(x + 1) = buffer[2];
-    *(x + 0) = buffer[3];
-    return buffer + 4;
+    return detail::load_le(data, buffer);
 }
 
-inline const std::uint8_t* decode_be(std::int32_t& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::int32_t& data, const std::uint8_t* buffer)
 {
-    std::uint8_t* x = reinterpret_cast<std::uint8_t*>(&data);
-    *(x + 3) = buffer[0];
-    *(x + 2) = buffer[1];
-    *(x + 1) = buffer[2];
-    *(x + 0) = buffer[3];
-    return buffer + 4;
+    return detail::load_le(data, buffer);
 }
 
 template<typename T, std::size_t N>
-inline const std::uint8_t* decode_be(std::array<T, N>& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::array<T, N>& data, const std::uint8_t* buffer)
 {
     for (T& x : data)
     {
-        buffer = decode_be(x, buffer);
+        buffer = decode_any_le(x, buffer);
     }
     return buffer;
 }
 
 template<std::size_t N>
-inline const std::uint8_t* decode_be(std::array<std::uint8_t, N>& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::array<std::uint8_t, N>& data, const std::uint8_t* buffer)
 {
-    memcpy(data.data(), buffer, N);
+    detail::copy_bytes(data.data(), buffer, N);
     return buffer + N;
 }
 
 template<std::size_t N>
-inline const std::uint8_t* decode_be(std::array<partbyte, N>& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_le(std::array<partbyte, N>& data, const std::uint8_t* buffer)
 {
-    std::copy(buffer, buffer + N, data.rbegin());
+    for (std::size_t i = 0; i < N; ++i)
+    {
+        data[i] = buffer[i];
+    }
     return buffer + N;
 }
 
 template<typename T>
-inline const std::uint8_t* decode_any_be(T& data, const std::uint8_t* buffer)
+constexpr const std::uint8_t* decode_any_le(T& data, const std::uint8_t* buffer)
+{
+    if constexpr (has_wire_endianness_v<T>)
+    {
+        static_assert(T::wireEndianness == endian::little, "Structure is generated only for big endian");
+        return decode(data, buffer);
+    }
+    else if constexpr (endian::native == endian::little)
+    {
+        return decode(data, buffer); // Same bytes as native coding, which has memcpy fast paths
+    }
+    else
+    {
+        return decode_le(data, buffer); // Hopes to find correct function with ADL
+    }
+}
+
+// ================================================================ //
+// ================================================================ //
+
+// Encodes whole message into array, can be used in constant expressions to build constant packets
+template<typename T>
+constexpr std::array<std::uint8_t, wire_size_v<T>> encode_to_array(const T& data)
 {
-    return decode_be(data, buffer); // Hopes to find correct function with ADL
+    std::array<std::uint8_t, wire_size_v<T>> buffer{};
+    encode_any(data, buffer.data());
+    return buffer;
+}
+
+template<typename T>
+constexpr std::array<std::uint8_t, wire_size_v<T>> encode_to_array_be(const T& data)
+{
+    std::array<std::uint8_t, wire_size_v<T>> buffer{};
+    encode_any_be(data, buffer.data());
+    return buffer;
+}
+
+template<typename T>
+constexpr std::array<std::uint8_t, wire_size_v<T>> encode_to_array_le(const T& data)
+{
+    std::array<std::uint8_t, wire_size_v<T>> buffer{};
+    encode_any_le(data, buffer.data());
+    return buffer;
 }
 
 }
@@ -0,0 +1,134 @@
+#pragma once
+
+#include "codec.hpp"
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <cstddef>
+#include <initializer_list>
+#include <ostream>
+#include <utility>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <x86intrin.h>
+#endif
+
+#if !CODEC_HAS_IS_CONSTANT_EVALUATED
+#error "Instrumented coders need std::is_constant_evaluated or __builtin_is_constant_evaluated"
+#endif
+
+// Counters used by instrumented generated coders.
+// Nothing from here is referenced when code is generated without instrumentation.
+// Coders count only when called at run time, in constant expressions they stay untouched.
+namespace codec
+{
+namespace stats
+{
+struct Operation
+{
+    std::atomic<std::uint64_t> calls{ 0 };
+    std::atomic<std::uint64_t> bytes{ 0 };
+    std::atomic<std::uint64_t> cycles{ 0 };
+};
+
+struct Counters;
+
+inline std::atomic<Counters*>& registry()
+{
+    static std::atomic<Counters*> head{ nullptr };
+    return head;
+}
+
+// One instance per structure, registers itself in global list on construction.
+// Structures with coders for both native and big endian count big endian ones in encode_be and decode_be.
+struct Counters
+{
+    const char* name;
+    Operation encode;
+    Operation decode;
+    Operation encode_be;
+    Operation decode_be;
+    Counters* next;
+
+    explicit Counters(const char* name_) : name{ name_ }, next{ registry().load() }
+    {
+        while(!registry().compare_exchange_weak(next, this)) {}
+    }
+
+    Counters(const Counters&) = delete;
+    Counters& operator=(const Counters&) = delete;
+};
+
+// Cycle counter on x86, nanoseconds elsewhere
+inline std::uint64_t cycles()
+{
+#if defined(__x86_64__) || defined(__i386__)
+    return __rdtsc();
+#else
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count();
+#endif
+}
+
+inline void count(Operation& operation, std::ptrdiff_t bytes)
+{
+    operation.calls.fetch_add(1, std::memory_order_relaxed);
+    operation.bytes.fetch_add(static_cast<std::uint64_t>(bytes), std::memory_order_relaxed);
+}
+
+inline void count(Operation& operation, std::ptrdiff_t bytes, std::uint64_t start)
+{
+    count(operation, bytes);
+    operation.cycles.fetch_add(cycles() - start, std::memory_order_relaxed);
+}
+
+template<typename F>
+void for_each(F&& f)
+{
+    for(Counters* counters = registry().load(); counters != nullptr; counters = counters->next)
+    {
+        f(*counters);
+    }
+}
+
+inline void reset()
+{
+    for_each([](Counters& counters) {
+        for(Operation* operation : { &counters.encode, &counters.decode, &counters.encode_be, &counters.decode_be })
+        {
+            operation->calls = 0;
+            operation->bytes = 0;
+            operation->cycles = 0;
+        }
+    });
+}
+
+// One line per structure and operation, e.g.:
+// codec_calls{structure="ARP::Header",operation="decode"} 10
+inline void write(std::ostream& out)
+{
+    for_each([&out](const Counters& counters) {
+        const std::pair<const char*, const Operation*> operations[] = {
+            { "encode", &counters.encode },
+            { "decode", &counters.decode },
+            { "encode_be", &counters.encode_be },
+            { "decode_be", &counters.decode_be }
+        };
+        for(const auto& operation : operations)
+        {
+            const char* metrics[] = { "codec_calls", "codec_bytes", "codec_cycles" };
+            std::uint64_t values[] = {
+                operation.second->calls.load(std::memory_order_relaxed),
+                operation.second->bytes.load(std::memory_order_relaxed),
+                operation.second->cycles.load(std::memory_order_relaxed)
+            };
+            for(std::size_t i = 0; i < 3; ++i)
+            {
+                out << metrics[i] << "{structure=\"" << counters.name << "\",operation=\"" << operation.first << "\"} "
+                    << values[i] << "\n";
+            }
+        }
+    });
+}
+}
+}
@@ -1,4 +1,6 @@
 #include "codec.hpp"
+#include "codec_stats.hpp"
+#include "neighbor_cache.hpp"
 #include <iostream>
 #include <array>
 #include <sstream>
@@ -16,9 +18,17 @@ struct TestMessage
     std::array<std::int16_t, 2> arr_i16;
     std::array<codec::partbyte, 3> arr_pb;
     std::array<std::uint32_t, 2> arr_u32;
+
+    static constexpr std::size_t wireSize =
+        codec::wire_size_v<std::uint8_t> + codec::wire_size_v<std::int8_t> +
+        codec::wire_size_v<std::uint16_t> + codec::wire_size_v<std::int16_t> +
+        codec::wire_size_v<std::uint32_t> + codec::wire_size_v<std::int32_t> +
+        codec::wire_size_v<std::array<std::uint8_t, 3>> + codec::wire_size_v<std::array<std::int16_t, 2>> +
+        codec::wire_size_v<std::array<codec::partbyte, 3>> + codec::wire_size_v<std::array<std::uint32_t, 2>>;
 };
 
 constexpr std::size_t messageSize = 32;
+static_assert(codec::wire_size_v<TestMessage> == messageSize, "Incorrect wire size of TestMessage");
 
 // Code as would be generated with python
 std::uint8_t* encode(const TestMessage& message, std::uint8_t* buffer)
@@ -145,6 +155,121 @@ namespace ns_2
     }
 }
 
+namespace ns_3
+{
+    struct Message
+    {
+        std::uint16_t x;
+        std::int32_t y;
+        std::array<codec::partbyte, 3> z;
+
+        static constexpr std::size_t wireSize = 9;
+    };
+
+    constexpr std::uint8_t* encode(const Message& message, std::uint8_t* buffer)
+    {
+        buffer = codec::encode_any(message.x, buffer);
+        buffer = codec::encode_any(message.y, buffer);
+        buffer = codec::encode_any(message.z, buffer);
+        return buffer;
+    }
+
+    constexpr std::uint8_t* encode_be(const Message& message, std::uint8_t* buffer)
+    {
+        buffer = codec::encode_any_be(message.x, buffer);
+        buffer = codec::encode_any_be(message.y, buffer);
+        buffer = codec::encode_any_be(message.z, buffer);
+        return buffer;
+    }
+
+    constexpr const std::uint8_t* decode_be(Message& message, const std::uint8_t* buffer)
+    {
+        buffer = codec::decode_any_be(message.x, buffer);
+        buffer = codec::decode_any_be(message.y, buffer);
+        buffer = codec::decode_any_be(message.z, buffer);
+        return buffer;
+    }
+
+    constexpr Message constantMessage{ 0x1234, -2, {0x11, 0x22, 0x33} };
+    constexpr auto constantPayload = codec::encode_to_array_be(constantMessage);
+
+    static_assert(constantPayload[0] == 0x12 && constantPayload[1] == 0x34, "Constant encode failed: incorrect x");
+    static_assert(constantPayload[2] == 0xFF && constantPayload[5] == 0xFE, "Constant encode failed: incorrect y");
+    static_assert(constantPayload[6] == 0x33 && constantPayload[8] == 0x11, "Constant encode failed: incorrect z");
+
+    constexpr Message decodeConstant()
+    {
+        Message message{};
+        codec::decode_any_be(message, constantPayload.data());
+        return message;
+    }
+
+    static_assert(decodeConstant().y == -2, "Constant decode failed");
+}
+
+// Code as would be generated for module with big endian wire byte order: single encode/decode pair
+namespace ns_4
+{
+    struct Inner
+    {
+        std::uint16_t x;
+        std::array<codec::partbyte, 2> y;
+
+        static constexpr std::size_t wireSize = 4;
+        static constexpr codec::endian wireEndianness = codec::endian::big;
+    };
+
+    constexpr std::uint8_t* encode(const Inner& data, std::uint8_t* buffer)
+    {
+        buffer = codec::encode_any_be(data.x, buffer);
+        buffer = codec::encode_any_be(data.y, buffer);
+        return buffer;
+    }
+
+    constexpr const std::uint8_t* decode(Inner& data, const std::uint8_t* buffer)
+    {
+        buffer = codec::decode_any_be(data.x, buffer);
+        buffer = codec::decode_any_be(data.y, buffer);
+        return buffer;
+    }
+
+    struct Message
+    {
+        Inner inner;
+        std::int16_t z;
+
+        static constexpr std::size_t wireSize = 6;
+        static constexpr codec::endian wireEndianness = codec::endian::big;
+    };
+
+    constexpr std::uint8_t* encode(const Message& data, std::uint8_t* buffer)
+    {
+        buffer = codec::encode_any_be(data.inner, buffer);
+        buffer = codec::encode_any_be(data.z, buffer);
+        return buffer;
+    }
+
+    static_assert(codec::has_wire_endianness_v<Message> && !codec::has_wire_endianness_v<ns_3::Message>, "Incorrect wire endianness trait");
+
+    constexpr auto payload = codec::encode_to_array_be(Message{ { 0x1234, { 0x01, 0x02 } }, -2 });
+    static_assert(payload[0] == 0x12 && payload[1] == 0x34 && payload[2] == 0x02 && payload[3] == 0x01, "Specialized encode failed: incorrect inner");
+    static_assert(payload[4] == 0xFF && payload[5] == 0xFE, "Specialized encode failed: incorrect z");
+
+    constexpr Inner decodeInner()
+    {
+        Inner inner{};
+        codec::decode_any_be(inner, payload.data());
+        return inner;
+    }
+
+    static_assert(decodeInner().x == 0x1234 && decodeInner().y[0] == codec::partbyte(0x01), "Specialized decode failed");
+
+    constexpr auto payload_le = codec::encode_to_array_le(ns_3::constantMessage);
+    static_assert(payload_le[0] == 0x34 && payload_le[1] == 0x12, "Little endian encode failed: incorrect x");
+    static_assert(payload_le[2] == 0xFE && payload_le[5] == 0xFF, "Little endian encode failed: incorrect y");
+    static_assert(payload_le[6] == 0x11 && payload_le[8] == 0x33, "Little endian encode failed: incorrect z");
+}
+
 int main()
 {
     try
@@ -338,6 +463,78 @@ int main()
                 std::cout << "Decode BIG TestMessage failed: incorrect arr_u32: " << decoded.arr_pb << "\n";
             }
         }
+        {
+            auto buffer = codec::encode_to_array(ns_3::constantMessage);
+            std::array<std::uint8_t, 9> expected = { 0x34, 0x12, 0xFE, 0xFF, 0xFF, 0xFF, 0x11, 0x22, 0x33 };
+            if(buffer != expected)
+            {
+                std::cout << "Encode to array failed: incorrect payload: " << printPayload(buffer.data(), buffer.data() + buffer.size()) << "\n";
+            }
+        }
+        {
+            static codec::stats::Counters counters{ "Test::Message" };
+            codec::stats::count(counters.decode, 9);
+            codec::stats::count(counters.decode, 9, codec::stats::cycles());
+
+            if(counters.decode.calls != 2 || counters.decode.bytes != 18 || counters.encode.calls != 0)
+            {
+                std::cout << "Stats test failed: incorrect counters: " << counters.decode.calls << " " << counters.decode.bytes << "\n";
+            }
+            std::stringstream out;
+            codec::stats::write(out);
+            if(out.str().find("codec_bytes{structure=\"Test::Message\",operation=\"decode\"} 18\n") == std::string::npos)
+            {
+                std::cout << "Stats test failed: incorrect output: " << out.str() << "\n";
+            }
+            codec::stats::reset();
+            if(counters.decode.calls != 0)
+            {
+                std::cout << "Stats test failed: counters not reset\n";
+            }
+        }
+        {
+            std::array<std::uint8_t, 4> buffer{};
+            codec::encode_le(std::uint32_t{ 0x11223344 }, buffer.data());
+            std::uint32_t decoded = 0;
+            codec::decode_le(decoded, buffer.data());
+            std::array<std::uint8_t, 4> expected = { 0x44, 0x33, 0x22, 0x11 };
+            if(buffer != expected || decoded != 0x11223344)
+            {
+                std::cout << "Little endian test failed: incorrect payload: " << printPayload(buffer.data(), buffer.data() + 4) << "\n";
+            }
+        }
+        {
+            codec::NeighborCache cache(4, 10);
+            std::array<codec::partbyte, 4> ip{ 1, 0, 0, 10 };
+            std::array<codec::partbyte, 6> mac{ 6, 5, 4, 3, 2, 1 };
+            cache.update(ip, mac, 0);
+
+            std::array<codec::partbyte, 6> found{};
+            if(codec::address_key(ip) != 0x0A000001 || !cache.lookup(ip, 5, found) || found != mac)
+            {
+                std::cout << "Neighbor cache test failed: address not found\n";
+            }
+            if(cache.lookup(ip, 10, found) || cache.size() != 0)
+            {
+                std::cout << "Neighbor cache test failed: address not expired\n";
+            }
+
+            for(std::uint32_t i = 0; i < 100; ++i)
+            {
+                cache.update(i, i + 1000, i);
+            }
+            std::uint64_t value = 0;
+            if(cache.size() != 4 || cache.lookup(95, 100, value) || !cache.lookup(96, 100, value) || value != 1096)
+            {
+                std::cout << "Neighbor cache test failed: least recently updated entry not evicted\n";
+            }
+            cache.update(97, 2000, 101);
+            cache.expire(109);
+            if(cache.size() != 1 || !cache.lookup(97, 109, value) || value != 2000)
+            {
+                std::cout << "Neighbor cache test failed: incorrect entries after expire: " << cache.size() << "\n";
+            }
+        }
     }
     catch(std::exception& e)
     {
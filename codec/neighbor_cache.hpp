@@ -0,0 +1,247 @@
+#pragma once
+
+#include <array>
+#include <cstdint>
+#include <cstddef>
+#include <vector>
+
+// IP -> MAC cache for generated ARP/Ethernet structures.
+// Entries expire after ttl (in caller's time units) and when cache is full
+// the least recently updated entry is evicted.
+// Index is open addressing table with linear probing, entries are kept in separate pool
+// linked in update order, so both lookup and update are O(1).
+namespace codec
+{
+// Array of partbyte is big integer stored from least significant byte,
+// so Ethernet::IPAddress{ 1, 0, 0, 10 } is 10.0.0.1 and has key 0x0A000001
+template<typename T, std::size_t N>
+constexpr std::uint64_t address_key(const std::array<T, N>& address)
+{
+    static_assert(N <= 8, "Address does not fit in key");
+    std::uint64_t key = 0;
+    for(std::size_t i = N; i > 0; --i)
+    {
+        key = (key << 8) | static_cast<std::uint8_t>(address[i - 1]);
+    }
+    return key;
+}
+
+template<typename T, std::size_t N>
+constexpr std::array<T, N> address_from_key(std::uint64_t key)
+{
+    std::array<T, N> address{};
+    for(std::size_t i = 0; i < N; ++i)
+    {
+        address[i] = static_cast<std::uint8_t>(key >> (8 * i));
+    }
+    return address;
+}
+
+class NeighborCache
+{
+public:
+    NeighborCache(std::size_t capacity, std::uint64_t ttl) :
+        entries(capacity),
+        slots(table_size(capacity)),
+        mask{ table_size(capacity) - 1 },
+        ttl{ ttl }
+    {
+        for(std::size_t i = 0; i < capacity; ++i)
+        {
+            entries[i].next = i + 1 < capacity ? static_cast<std::uint32_t>(i + 1) : npos;
+        }
+        free = capacity > 0 ? 0 : npos;
+    }
+
+    std::size_t size() const { return count; }
+    std::size_t capacity() const { return entries.size(); }
+
+    // Returns true and sets mac if address is known and not expired
+    bool lookup(std::uint32_t ip, std::uint64_t now, std::uint64_t& mac)
+    {
+        std::size_t slot = find(ip);
+        if(slots[slot].entry == npos)
+        {
+            return false;
+        }
+        const Entry& entry = entries[slots[slot].entry];
+        if(entry.expiry <= now)
+        {
+            erase(slot);
+            return false;
+        }
+        mac = entry.mac;
+        return true;
+    }
+
+    template<typename T, typename U, std::size_t M>
+    bool lookup(const std::array<T, 4>& ip, std::uint64_t now, std::array<U, M>& mac)
+    {
+        std::uint64_t key = 0;
+        if(!lookup(static_cast<std::uint32_t>(address_key(ip)), now, key))
+        {
+            return false;
+        }
+        mac = address_from_key<U, M>(key);
+        return true;
+    }
+
+    void update(std::uint32_t ip, std::uint64_t mac, std::uint64_t now)
+    {
+        if(entries.empty())
+        {
+            return;
+        }
+        std::size_t slot = find(ip);
+        if(slots[slot].entry == npos)
+        {
+            if(free == npos)
+            {
+                erase(find(entries[head].ip));
+                slot = find(ip);
+            }
+            std::uint32_t index = free;
+            free = entries[index].next;
+            entries[index].ip = ip;
+            slots[slot] = Slot{ ip, index };
+            ++count;
+            link(index);
+        }
+        else
+        {
+            std::uint32_t index = slots[slot].entry;
+            unlink(index);
+            link(index);
+        }
+        Entry& entry = entries[slots[slot].entry];
+        entry.mac = mac;
+        entry.expiry = now + ttl;
+    }
+
+    template<typename T, typename U, std::size_t M>
+    void update(const std::array<T, 4>& ip, const std::array<U, M>& mac, std::uint64_t now)
+    {
+        update(static_cast<std::uint32_t>(address_key(ip)), address_key(mac), now);
+    }
+
+    // Learns sender addresses of all headers with given operation, e.g. ARP::operation_reply
+    template<typename Iterator>
+    void update_from_replies(Iterator first, Iterator last, std::uint64_t now, std::uint16_t operation)
+    {
+        for(; first != last; ++first)
+        {
+            if(first->operation == operation)
+            {
+                update(first->senderProtocolAddress, first->senderHardwareAddress, now);
+            }
+        }
+    }
+
+    // Removes all expired entries, cost is proportional to number of removed ones
+    void expire(std::uint64_t now)
+    {
+        while(head != npos && entries[head].expiry <= now)
+        {
+            erase(find(entries[head].ip));
+        }
+    }
+
+private:
+    static constexpr std::uint32_t npos = 0xFFFFFFFF;
+
+    struct Entry
+    {
+        std::uint64_t mac = 0;
+        std::uint64_t expiry = 0;
+        std::uint32_t ip = 0;
+        std::uint32_t previous = npos;
+        std::uint32_t next = npos;
+    };
+
+    struct Slot
+    {
+        std::uint32_t ip = 0;
+        std::uint32_t entry = npos;
+    };
+
+    // At most half of slots are used, so probe sequences stay short
+    static std::size_t table_size(std::size_t capacity)
+    {
+        std::size_t size = 2;
+        while(size < 2 * capacity)
+        {
+            size *= 2;
+        }
+        return size;
+    }
+
+    std::size_t home(std::uint32_t ip) const
+    {
+        return static_cast<std::size_t>((ip * std::uint64_t{ 0x9E3779B97F4A7C15 }) >> 32) & mask;
+    }
+
+    std::size_t find(std::uint32_t ip) const
+    {
+        std::size_t slot = home(ip);
+        while(slots[slot].entry != npos && slots[slot].ip != ip)
+        {
+            slot = (slot + 1) & mask;
+        }
+        return slot;
+    }
+
+    void link(std::uint32_t index)
+    {
+        entries[index].previous = tail;
+        entries[index].next = npos;
+        if(tail != npos)
+        {
+            entries[tail].next = index;
+        }
+        else
+        {
+            head = index;
+        }
+        tail = index;
+    }
+
+    void unlink(std::uint32_t index)
+    {
+        Entry& entry = entries[index];
+        if(entry.previous != npos) { entries[entry.previous].next = entry.next; } else { head = entry.next; }
+        if(entry.next != npos) { entries[entry.next].previous = entry.previous; } else { tail = entry.previous; }
+    }
+
+    // Backward shift deletion, keeps probe sequences valid without tombstones
+    void erase(std::size_t slot)
+    {
+        std::uint32_t index = slots[slot].entry;
+        unlink(index);
+        entries[index].next = free;
+        free = index;
+        --count;
+
+        std::size_t next = (slot + 1) & mask;
+        while(slots[next].entry != npos)
+        {
+            std::size_t wanted = home(slots[next].ip);
+            if(((next - wanted) & mask) >= ((next - slot) & mask))
+            {
+                slots[slot] = slots[next];
+                slot = next;
+            }
+            next = (next + 1) & mask;
+        }
+        slots[slot] = Slot{};
+    }
+
+    std::vector<Entry> entries;
+    std::vector<Slot> slots;
+    std::size_t mask;
+    std::uint64_t ttl;
+    std::size_t count = 0;
+    std::uint32_t head = npos;
+    std::uint32_t tail = npos;
+    std::uint32_t free = npos;
+};
+}
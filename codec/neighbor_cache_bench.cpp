@@ -0,0 +1,63 @@
+#include "codec.hpp"
+#include "neighbor_cache.hpp"
+#include <chrono>
+#include <iostream>
+#include <vector>
+
+// Mimics layout of generated ARP::Header, only fields used by cache are needed
+struct Reply
+{
+    std::uint16_t operation;
+    std::array<codec::partbyte, 6> senderHardwareAddress;
+    std::array<codec::partbyte, 4> senderProtocolAddress;
+};
+
+template<typename F>
+void measure(const char* name, std::size_t operations, F&& f)
+{
+    auto start = std::chrono::steady_clock::now();
+    f();
+    auto elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    std::cout << name << ": " << elapsed * 1e9 / operations << " ns/op\n";
+}
+
+int main()
+{
+    constexpr std::size_t entries = 1000000;
+    codec::NeighborCache cache(entries, 60);
+
+    std::vector<Reply> replies(entries);
+    for(std::size_t i = 0; i < entries; ++i)
+    {
+        std::uint32_t ip = static_cast<std::uint32_t>(0x0A000000 + i * 7919);
+        replies[i].operation = 2;
+        replies[i].senderProtocolAddress = codec::address_from_key<codec::partbyte, 4>(ip);
+        replies[i].senderHardwareAddress = codec::address_from_key<codec::partbyte, 6>(0x020000000000 + i);
+    }
+
+    measure("update_from_replies", entries, [&]() {
+        cache.update_from_replies(replies.begin(), replies.end(), 0, 2);
+    });
+
+    std::uint64_t found = 0;
+    measure("lookup", entries, [&]() {
+        for(const Reply& reply : replies)
+        {
+            std::array<codec::partbyte, 6> mac;
+            found += cache.lookup(reply.senderProtocolAddress, 1, mac);
+        }
+    });
+
+    measure("update with eviction", entries, [&]() {
+        for(std::size_t i = 0; i < entries; ++i)
+        {
+            cache.update(static_cast<std::uint32_t>(0x0B000000 + i), i, 10);
+        }
+    });
+
+    measure("expire", entries, [&]() {
+        cache.expire(70);
+    });
+
+    std::cout << "found: " << found << ", size after expire: " << cache.size() << "\n";
+}
@@ -0,0 +1,54 @@
+import printers.protocol_hash as protocol_hash
+import printers.protocol_resolution as protocol_resolution
+import printers.protocol_types as protocol_types
+
+import argparse
+import runpy
+import sys
+
+
+# Compares wire layout of modules defined in two versions of protocol definition file, e.g.:
+#   git show HEAD~1:ethernet/arp.py > arp_old.py
+#   python diff_protocols.py arp_old.py ethernet/arp.py
+
+
+def load_modules(path):
+    variables = runpy.run_path(path)
+    return dict([(x.name, x) for x in variables.values() if isinstance(x, protocol_types.Module)])
+
+
+def diff_files(old_path, new_path):
+    old_modules = load_modules(old_path)
+    new_modules = load_modules(new_path)
+    changes = []
+    for name in old_modules:
+        if name not in new_modules:
+            changes.append("{}: module removed".format(name))
+    for name, module in new_modules.items():
+        if name not in old_modules:
+            changes.append("{}: module added".format(name))
+        else:
+            changes += protocol_hash.diff_modules(old_modules[name], module)
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lists wire layout changes between two protocol definition files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--hashes", action="store_true", help="print layout hashes of modules and structures")
+    args = parser.parse_args()
+
+    if args.hashes:
+        for path in [args.old, args.new]:
+            for module in load_modules(path).values():
+                hasher = protocol_hash.LayoutHasher(protocol_resolution.SymbolTable([module]))
+                print("{}: {}: 0x{:016x}".format(path, module.name, hasher.hash(module)))
+                for name, element in module.items():
+                    if isinstance(element, protocol_types.Structure):
+                        print("{}: {}.{}: 0x{:016x}".format(path, module.name, name, hasher.hash(element)))
+
+    changes = diff_files(args.old, args.new)
+    for change in changes:
+        print(change)
+    sys.exit(1 if len(changes) > 0 else 0)
@@ -8,7 +8,7 @@ ARP[""] = Line()
 ARP["headerSize"] = Constant(28, uint8("dec"))
 
 ARP["hardwareType_Ethernet"] = Constant(1, uint8("hex"))
-ARP["protocolType_IPv4"] = Constant(0x0800, uint8("hex"))
+ARP["protocolType_IPv4"] = Constant(0x0800, uint16("hex"))
 ARP["hardwareAddressLength_Ethernet"] = Constant(6, uint8("dec"))
 ARP["protocolAddressLength_IPv4"] = Constant(4, uint8("dec"))
 
@@ -19,6 +19,7 @@ ARP["operation_replyReverse"] = Constant(4, uint16("dec"))
 ARP["operation_InARP_request"] = Constant(8, uint16("dec"))
 ARP["operation_InARP_reply"] = Constant(9, uint16("dec"))
 ARP["operation_ARP_NAK"] = Constant(10, uint16("dec"))
+ARP["Operation"] = Enum(prefix="operation")
 
 ARP[""] = Line()
 ARP["Header"] = Structure(attributes = [PackedAttribute()], fields = [
@@ -32,3 +33,9 @@ ARP["Header"] = Structure(attributes = [PackedAttribute()], fields = [
     Field("targetHardwareAddress", Reference("MACAddress", ethernet.Ethernet)),
     Field("targetProtocolAddress", Reference("IPAddress", ethernet.Ethernet)),
 ])
+
+ARP[""] = Line()
+ARP["Frame"] = Encapsulation([
+    Layer("ethernet", Reference("Header", ethernet.Ethernet)),
+    Layer("arp", Reference("Header", ARP), "typeOrLength", Reference("etherType_ARP", ethernet.Ethernet)),
+])
@@ -0,0 +1,221 @@
+from ethernet.codecs import Ethernet, ARP
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import mmap
+import os
+import struct
+
+
+# Summaries of pcap capture files, decoded in parallel.
+#
+# File is split into chunks of equal byte size. Every worker process maps the file itself, resyncs to the first
+# record header in its chunk and decodes records starting there in place, so only chunk offsets and small
+# per-chunk summaries are pickled between processes. Records carry no marker, so workers recognize headers by
+# plausible values; parent checks that every chunk starts where the preceding one ended and decodes chunks
+# again from there when resync was wrong.
+
+PCAP_HEADER_SIZE = 24
+RECORD_HEADER_SIZE = 16
+LINKTYPE_ETHERNET = 1
+# Consecutive plausible record headers needed to accept resync position
+RESYNC_RECORDS = 8
+# Largest difference in seconds between timestamps of consecutive records
+RESYNC_MAX_GAP = 3600
+# Limit of frame size, also used as snap length when capture has none
+MAX_SNAP_LENGTH = 262144
+
+_MAGICS = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1000000),  # microseconds, little endian
+    b"\xa1\xb2\xc3\xd4": (">", 1000000),  # microseconds, big endian
+    b"\x4d\x3c\xb2\xa1": ("<", 1000000000),  # nanoseconds, little endian
+    b"\xa1\xb2\x3c\x4d": (">", 1000000000),  # nanoseconds, big endian
+}
+
+
+class CaptureFormat(object):
+    """Values of pcap global header needed to read records."""
+
+    def __init__(self, data):
+        magic = bytes(data[0:4])
+        if len(data) < PCAP_HEADER_SIZE or magic not in _MAGICS:
+            raise ValueError("Not a pcap file")
+        self.byte_order, self.fraction_limit = _MAGICS[magic]
+        _, _, _, _, snap_length, link_type = struct.unpack_from(self.byte_order + "HHiIII", data, 4)
+        # Upper bits of link type field may hold FCS length
+        if link_type & 0xffff != LINKTYPE_ETHERNET:
+            raise ValueError("Capture link type {} is not Ethernet".format(link_type & 0xffff))
+        self.snap_length = snap_length or MAX_SNAP_LENGTH
+        self.record = struct.Struct(self.byte_order + "IIII")
+
+
+def write_pcap(path, frames, snap_length=65535):
+    """Writes frames as pcap file with Ethernet link type."""
+    with open(path, "wb") as file:
+        file.write(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, snap_length, LINKTYPE_ETHERNET))
+        record = struct.Struct("<IIII")
+        for i, frame in enumerate(frames):
+            file.write(record.pack(i, 0, len(frame), len(frame)))
+            file.write(frame)
+
+
+def split_chunks(size, chunks):
+    """Returns (start, end) offsets of at most given number of equal chunks of records in file of given size."""
+    step = max(1, -(-(size - PCAP_HEADER_SIZE) // max(1, chunks)))
+    return [(x, min(x + step, size)) for x in range(PCAP_HEADER_SIZE, size, step)]
+
+
+def _records_follow(data, offset, capture_format):
+    size = len(data)
+    previous_seconds = None
+    for _ in range(RESYNC_RECORDS):
+        # Record going past end of file is taken as wrong guess, truncated last record is left to parent check
+        if offset + RECORD_HEADER_SIZE > size:
+            return offset <= size
+        seconds, fraction, included_length, original_length = capture_format.record.unpack_from(data, offset)
+        if (fraction >= capture_format.fraction_limit or original_length == 0 or original_length > MAX_SNAP_LENGTH
+                or included_length > original_length or included_length > capture_format.snap_length):
+            return False
+        if previous_seconds is not None and abs(seconds - previous_seconds) > RESYNC_MAX_GAP:
+            return False
+        previous_seconds = seconds
+        offset += RECORD_HEADER_SIZE + included_length
+    return True
+
+
+def find_record(data, start, end, capture_format):
+    """Returns offset of first plausible record header in [start, end), end if there is none."""
+    for offset in range(start, end):
+        if _records_follow(data, offset, capture_format):
+            return offset
+    return end
+
+
+class CaptureSummary(object):
+    """Mergeable statistics of capture.
+
+    ARP requests and replies are counted by (asking IP, asked IP) key, so pairs can be matched
+    after results of all chunks are merged.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.truncated = 0
+        self.ether_types = Counter()
+        self.arp_operations = Counter()
+        self.arp_requests = Counter()
+        self.arp_replies = Counter()
+
+    def merge(self, other):
+        self.frames += other.frames
+        self.truncated += other.truncated
+        self.ether_types.update(other.ether_types)
+        self.arp_operations.update(other.arp_operations)
+        self.arp_requests.update(other.arp_requests)
+        self.arp_replies.update(other.arp_replies)
+        return self
+
+    def arp_pairs(self):
+        """Number of ARP requests that have matching reply."""
+        return sum([min(count, self.arp_replies[key]) for key, count in self.arp_requests.items()])
+
+    def unanswered_arp_requests(self):
+        return sum(self.arp_requests.values()) - self.arp_pairs()
+
+
+def summarize_chunk(data, start, end, capture_format):
+    """Summarizes records with header in [start, end), start must be offset of record header.
+
+    Returns (summary, offset of first record after chunk).
+    """
+    summary = CaptureSummary()
+    record = capture_format.record
+    size = len(data)
+    ethernet_size = Ethernet.Header.wireSize
+    arp_size = ethernet_size + ARP.Header.wireSize
+    decode_ethernet = Ethernet.Header.decode
+    decode_arp = ARP.Header.decode
+    ether_types = summary.ether_types
+
+    offset = start
+    while offset < end and offset + RECORD_HEADER_SIZE <= size:
+        _, _, included_length, _ = record.unpack_from(data, offset)
+        frame = offset + RECORD_HEADER_SIZE
+        offset = frame + included_length
+        summary.frames += 1
+        if included_length < ethernet_size or offset > size:
+            summary.truncated += 1
+            continue
+
+        ether_type = decode_ethernet(data, frame).typeOrLength
+        ether_types[ether_type] += 1
+        if ether_type != Ethernet.etherType_ARP:
+            continue
+        if included_length < arp_size:
+            summary.truncated += 1
+            continue
+
+        arp = decode_arp(data, frame + ethernet_size)
+        summary.arp_operations[arp.operation] += 1
+        if arp.operation == ARP.operation_request:
+            summary.arp_requests[arp.senderProtocolAddress + arp.targetProtocolAddress] += 1
+        elif arp.operation == ARP.operation_reply:
+            summary.arp_replies[arp.targetProtocolAddress + arp.senderProtocolAddress] += 1
+    return summary, offset
+
+
+def _summarize_file_chunk(path, start, end, resync):
+    # Returns (offset of first record, offset of first record after chunk, summary)
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            capture_format = CaptureFormat(data)
+            first = find_record(data, start, end, capture_format) if resync else start
+            summary, next_record = summarize_chunk(data, first, end, capture_format)
+            return first, next_record, summary
+
+
+def summarize(path, workers=None, chunks_per_worker=4):
+    """Decodes capture file with process pool and returns merged CaptureSummary."""
+    workers = workers if workers is not None else os.cpu_count() or 1
+    summary = CaptureSummary()
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        CaptureFormat(file.read(PCAP_HEADER_SIZE))
+    if size <= PCAP_HEADER_SIZE:
+        return summary
+
+    if workers == 1:
+        _, _, chunk_summary = _summarize_file_chunk(path, PCAP_HEADER_SIZE, size, False)
+        return summary.merge(chunk_summary)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = split_chunks(size, workers * chunks_per_worker)
+        futures = [executor.submit(_summarize_file_chunk, path, start, end, start != PCAP_HEADER_SIZE)
+                   for start, end in chunks]
+        expected = PCAP_HEADER_SIZE
+        for (start, end), future in zip(chunks, futures):
+            first, next_record, chunk_summary = future.result()
+            if first != expected:
+                # Resync stopped at bytes looking like record header, or chunk lies inside one record
+                first, next_record, chunk_summary = _summarize_file_chunk(path, expected, end, False)
+            summary.merge(chunk_summary)
+            expected = next_record
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Counts etherTypes and ARP request/reply pairs in pcap file")
+    parser.add_argument("capture")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    result = summarize(args.capture, args.workers)
+    print("frames: {}".format(result.frames))
+    print("truncated: {}".format(result.truncated))
+    for ether_type, count in sorted(result.ether_types.items()):
+        print("etherType 0x{:04x}: {}".format(ether_type, count))
+    for operation, count in sorted(result.arp_operations.items()):
+        print("ARP operation {}: {}".format(operation, count))
+    print("ARP request/reply pairs: {}".format(result.arp_pairs()))
+    print("ARP unanswered requests: {}".format(result.unanswered_arp_requests()))
@@ -0,0 +1,17 @@
+import ethernet.ethernet as ethernet
+import ethernet.arp as arp
+import printers.protocol_python_printer as protocol_python_printer
+import printers.protocol_types as protocol_types
+
+
+# Python codecs generated in memory from protocol definitions, so tools can use them without print step
+
+ethernet_protocol = protocol_types.Protocol("EthernetProtocol", [
+    ethernet.Ethernet,
+    arp.ARP,
+], wire_endianness=protocol_types.BigEndian)
+
+_modules = protocol_python_printer.PythonPrinter(ethernet_protocol).load()
+
+Ethernet = _modules["Ethernet"]
+ARP = _modules["ARP"]
@@ -0,0 +1,124 @@
+from array import array
+from collections import OrderedDict
+import time
+
+
+# IP -> MAC cache keyed on Ethernet.IPAddress, the same as codec/neighbor_cache.hpp.
+#
+# Addresses are kept as integers: IPAddress is array of partbyte, so it is little endian integer
+# of its decoded bytes (b"\x01\x00\x00\x0a" is 10.0.0.1, key 0x0a000001).
+# Index maps key to slot of preallocated arrays with MACs and expiry times.
+# Index is ordered by last update, so both eviction of least recently updated entry
+# and removal of expired entries only look at its front.
+
+
+def address_key(address):
+    return int.from_bytes(address, "little")
+
+
+def address_from_key(key, size):
+    return key.to_bytes(size, "little")
+
+
+class NeighborCache(object):
+    def __init__(self, capacity, ttl, clock=time.monotonic):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self.slots = OrderedDict()
+        self.macs = array("Q", bytes(8 * capacity))
+        self.expiry = array("d", bytes(8 * capacity))
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, address):
+        return self.lookup_key(address_key(address)) is not None
+
+    def lookup_key(self, key, now=None):
+        """Returns MAC of IP as integer, or None if it is unknown or expired."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        if self.expiry[slot] <= (self.clock() if now is None else now):
+            del self.slots[key]
+            self.free.append(slot)
+            return None
+        return self.macs[slot]
+
+    def lookup(self, address, now=None):
+        """Returns MACAddress of IPAddress, or None if it is unknown or expired."""
+        mac = self.lookup_key(address_key(address), now)
+        return None if mac is None else address_from_key(mac, 6)
+
+    def update_key(self, key, mac, now=None):
+        # Cache without capacity keeps nothing, as in C++
+        if self.capacity == 0:
+            return
+        slots = self.slots
+        slot = slots.get(key)
+        if slot is None:
+            if len(self.free) == 0:
+                _, evicted = slots.popitem(last=False)
+                self.free.append(evicted)
+            slot = self.free.pop()
+            slots[key] = slot
+        else:
+            slots.move_to_end(key)
+        self.macs[slot] = mac
+        self.expiry[slot] = (self.clock() if now is None else now) + self.ttl
+
+    def update(self, address, mac, now=None):
+        self.update_key(address_key(address), address_key(mac), now)
+
+    def update_from_replies(self, headers, operation, now=None):
+        """Learns sender addresses of all decoded ARP.Header with given operation, e.g. ARP.operation_reply."""
+        now = self.clock() if now is None else now
+        update_key = self.update_key
+        for header in headers:
+            if header.operation == operation:
+                update_key(
+                    int.from_bytes(header.senderProtocolAddress, "little"),
+                    int.from_bytes(header.senderHardwareAddress, "little"),
+                    now)
+
+    def expire(self, now=None):
+        """Removes expired entries, cost is proportional to number of removed ones."""
+        now = self.clock() if now is None else now
+        slots = self.slots
+        expiry = self.expiry
+        free = self.free
+        while len(slots) > 0:
+            key, slot = slots.popitem(last=False)
+            if expiry[slot] > now:
+                slots[key] = slot
+                slots.move_to_end(key, last=False)
+                break
+            free.append(slot)
+
+
+if __name__ == "__main__":
+    from ethernet.codecs import ARP
+
+    entries = 1000000
+
+    def measure(name, function):
+        start = time.perf_counter()
+        function()
+        print("{}: {:.0f} ns/op".format(name, (time.perf_counter() - start) * 1e9 / entries))
+
+    replies = [
+        ARP.Header(
+            operation=ARP.operation_reply,
+            senderHardwareAddress=address_from_key(0x020000000000 + i, 6),
+            senderProtocolAddress=address_from_key((0x0a000000 + i * 7919) & 0xffffffff, 4))
+        for i in range(entries)
+    ]
+    cache = NeighborCache(entries, 60)
+
+    measure("update_from_replies", lambda: cache.update_from_replies(replies, ARP.operation_reply, 0))
+    measure("lookup", lambda: [cache.lookup(x.senderProtocolAddress, 1) for x in replies])
+    measure("update with eviction", lambda: [cache.update_key(0x0b000000 + i, i, 10) for i in range(entries)])
+    measure("expire", lambda: cache.expire(70))
+    print("size after expire: {}".format(len(cache)))
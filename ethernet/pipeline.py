@@ -0,0 +1,163 @@
+from ethernet.codecs import Ethernet, ARP
+
+import asyncio
+
+
+# Asynchronous decoding of raw Ethernet frames.
+#
+# Frames are read from any async iterable of bytes-like objects (see socket_frames and memory_frames),
+# grouped into batches and decoded with generated Python codecs. Each batch is split by etherType
+# (and ARP operation) and every group is passed to its async handler at once.
+# Reader and decoder are connected with bounded queue, so slow handlers stop reading from source.
+
+
+async def memory_frames(frames):
+    """Source yielding frames from in-memory iterable."""
+    for frame in frames:
+        yield frame
+
+
+async def socket_frames(sock, max_size=65536):
+    """Source yielding one frame per datagram of non-blocking socket, e.g. AF_PACKET or socketpair(SOCK_DGRAM)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        frame = await loop.sock_recv(sock, max_size)
+        if len(frame) == 0:
+            return
+        yield frame
+
+
+class PipelineStats(object):
+    def __init__(self):
+        self.frames = 0
+        self.batches = 0
+        self.truncated = 0
+        self.unhandled = 0
+
+
+class FramePipeline(object):
+    """Decodes frames in batches and dispatches them to handlers.
+
+    Handlers of etherType receive list of (Ethernet.Header, frame) pairs.
+    Handlers of ARP operations receive list of (Ethernet.Header, ARP.Header) pairs.
+    ARP frames without handler for their operation go to etherType handler of ARP, if any.
+    """
+
+    def __init__(self, batch_size=64, batch_timeout=0.01, queue_size=8):
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.queue_size = queue_size
+        self.ether_type_handlers = {}
+        self.arp_handlers = {}
+        self.default_handler = None
+        self.stats = PipelineStats()
+
+    def on_ether_type(self, ether_type, handler):
+        self.ether_type_handlers[ether_type] = handler
+
+    def on_arp(self, operation, handler):
+        self.arp_handlers[operation] = handler
+
+    def on_default(self, handler):
+        self.default_handler = handler
+
+    async def run(self, source):
+        """Processes all frames from source. Returns when source is exhausted and all batches are handled.
+
+        Error raised by source is raised from here after frames read before it are handled.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        reader = asyncio.ensure_future(self._read(source, queue))
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    break
+                await self._dispatch(batch)
+        except BaseException:
+            reader.cancel()
+            raise
+        # Raises error of source, if any
+        await reader
+        return self.stats
+
+    async def _read(self, source, queue):
+        loop = asyncio.get_running_loop()
+        iterator = source.__aiter__()
+        batch = []
+        deadline = None
+        pending = None
+        cancelled = False
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                # Partial batch is flushed when source is idle for batch_timeout
+                timeout = None if len(batch) == 0 else max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait([pending], timeout=timeout)
+                if len(done) == 0:
+                    await queue.put(batch)
+                    batch = []
+                    continue
+                task, pending = pending, None
+                try:
+                    frame = task.result()
+                except StopAsyncIteration:
+                    break
+                if len(batch) == 0:
+                    deadline = loop.time() + self.batch_timeout
+                batch.append(frame)
+                if len(batch) >= self.batch_size:
+                    await queue.put(batch)
+                    batch = []
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Read from source still waiting when reader is cancelled
+            if pending is not None:
+                pending.cancel()
+            # Frames read before source ended or failed are still dispatched, run then re-raises error of source
+            if not cancelled:
+                if len(batch) > 0:
+                    await queue.put(batch)
+                await queue.put(None)
+
+    def _decode(self, batch):
+        by_ether_type = {}
+        by_operation = {}
+        ethernet_size = Ethernet.Header.wireSize
+        arp_size = ethernet_size + ARP.Header.wireSize
+        decode_ethernet = Ethernet.Header.decode
+        decode_arp = ARP.Header.decode
+
+        for frame in batch:
+            if len(frame) < ethernet_size:
+                self.stats.truncated += 1
+                continue
+            ethernet_header = decode_ethernet(frame)
+            ether_type = ethernet_header.typeOrLength
+            if ether_type == Ethernet.etherType_ARP:
+                if len(frame) < arp_size:
+                    self.stats.truncated += 1
+                    continue
+                arp_header = decode_arp(frame, ethernet_size)
+                if arp_header.operation in self.arp_handlers:
+                    by_operation.setdefault(arp_header.operation, []).append((ethernet_header, arp_header))
+                    continue
+            by_ether_type.setdefault(ether_type, []).append((ethernet_header, frame))
+        return by_ether_type, by_operation
+
+    async def _dispatch(self, batch):
+        self.stats.batches += 1
+        self.stats.frames += len(batch)
+        by_ether_type, by_operation = self._decode(batch)
+
+        for operation, frames in by_operation.items():
+            await self.arp_handlers[operation](frames)
+        for ether_type, frames in by_ether_type.items():
+            handler = self.ether_type_handlers.get(ether_type, self.default_handler)
+            if handler is None:
+                self.stats.unhandled += len(frames)
+            else:
+                await handler(frames)
@@ -0,0 +1,515 @@
+"""Randomized round-trip check of generated backends.
+
+Randomly generated protocols are encoded with every backend that can be built locally: C++, C and Python.
+Python reference encoder below is the oracle all backends must agree with.
+C# backend is not covered, its structures have no coders to compare.
+"""
+
+import printers.protocol_c_printer as protocol_c_printer
+import printers.protocol_cpp_printer as protocol_cpp_printer
+import printers.protocol_python_printer as protocol_python_printer
+import printers.protocol_resolution as protocol_resolution
+import printers.protocol_types as protocol_types
+
+import argparse
+import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+
+
+PRIMITIVES = [
+    (protocol_types.partbyte, "B", 0, 0xFF),
+    (protocol_types.uint8, "B", 0, 0xFF),
+    (protocol_types.int8, "b", -0x80, 0x7F),
+    (protocol_types.uint16, "H", 0, 0xFFFF),
+    (protocol_types.int16, "h", -0x8000, 0x7FFF),
+    (protocol_types.uint32, "I", 0, 0xFFFFFFFF),
+    (protocol_types.int32, "i", -0x80000000, 0x7FFFFFFF),
+]
+
+NATIVE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+
+def primitive_info(type):
+    for cls, code, low, high in PRIMITIVES:
+        if type.__class__ is cls:
+            return code, low, high
+    return None
+
+
+class RandomValueGenerator(object):
+    def __init__(self, rng, symbols):
+        self.rng = rng
+        self.symbols = symbols
+
+    def primitive(self, type):
+        _, low, high = primitive_info(type)
+        # Limits are rarely drawn from whole range, so they are picked on their own
+        if self.rng.random() < 0.2:
+            return self.rng.choice([low, high])
+        return self.rng.randint(low, high)
+
+    visit_partbyte = primitive
+    visit_uint8 = primitive
+    visit_int8 = primitive
+    visit_uint16 = primitive
+    visit_int16 = primitive
+    visit_uint32 = primitive
+    visit_int32 = primitive
+
+    def visit_array(self, type):
+        return [type.internal_type.visit(self) for _ in range(type.size)]
+
+    def visit_reference(self, type):
+        return self.symbols.resolve(type).visit(self)
+
+    def visit_type_alias(self, type):
+        return type.type.visit(self)
+
+    def visit_structure(self, type):
+        values = {}
+        for field in type.values():
+            values[field.name] = field.value if field.value is not None else field.type.visit(self)
+        return values
+
+
+class ReferenceEncoder(object):
+    # order: struct module byte order, "=" for native
+    def __init__(self, symbols, order):
+        self.symbols = symbols
+        self.order = NATIVE_ORDER if order == "=" else order
+        self.big_endian = order == ">"
+
+    def primitive(self, type, value):
+        code, _, _ = primitive_info(type)
+        return struct.pack(self.order + code, value)
+
+    visit_partbyte = primitive
+    visit_uint8 = primitive
+    visit_int8 = primitive
+    visit_uint16 = primitive
+    visit_int16 = primitive
+    visit_uint32 = primitive
+    visit_int32 = primitive
+
+    def visit_array(self, type, value):
+        # Arrays of partbyte are treated as big integer that needs reverse byte order in big endian
+        if self.big_endian and isinstance(type.internal_type, protocol_types.partbyte):
+            value = reversed(value)
+        return b"".join([type.internal_type.visit(self, x) for x in value])
+
+    def visit_reference(self, type, value):
+        return self.symbols.resolve(type).visit(self, value)
+
+    def visit_type_alias(self, type, value):
+        return type.type.visit(self, value)
+
+    def visit_structure(self, type, value):
+        return b"".join([field.type.visit(self, value[field.name]) for field in type.values()])
+
+
+class LeafAssignments(object):
+    """Flattens a value into (access path, literal) pairs usable as C and C++ assignments."""
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+
+    def primitive(self, type, value, path):
+        code, low, _ = primitive_info(type)
+        # 2147483648 does not fit in int, so negating it is not a valid int literal
+        if code == "i" and value == low:
+            return [(path, "({}-1)".format(low + 1))]
+        return [(path, "{}{}".format(value, "u" if code.isupper() else ""))]
+
+    visit_partbyte = primitive
+    visit_uint8 = primitive
+    visit_int8 = primitive
+    visit_uint16 = primitive
+    visit_int16 = primitive
+    visit_uint32 = primitive
+    visit_int32 = primitive
+
+    def visit_array(self, type, value, path):
+        assignments = []
+        for i, x in enumerate(value):
+            assignments += type.internal_type.visit(self, x, "{}[{}]".format(path, i))
+        return assignments
+
+    def visit_reference(self, type, value, path):
+        return self.symbols.resolve(type).visit(self, value, path)
+
+    def visit_type_alias(self, type, value, path):
+        return type.type.visit(self, value, path)
+
+    def visit_structure(self, type, value, path):
+        assignments = []
+        for field in type.values():
+            assignments += field.type.visit(self, value[field.name], "{}.{}".format(path, field.name))
+        return assignments
+
+
+class PythonValues(object):
+    """Converts value to objects of generated Python module."""
+
+    def __init__(self, symbols, modules):
+        self.symbols = symbols
+        self.modules = modules
+
+    def primitive(self, type, value):
+        return value
+
+    visit_partbyte = primitive
+    visit_uint8 = primitive
+    visit_int8 = primitive
+    visit_uint16 = primitive
+    visit_int16 = primitive
+    visit_uint32 = primitive
+    visit_int32 = primitive
+
+    def visit_array(self, type, value):
+        if isinstance(type.internal_type, (protocol_types.uint8, protocol_types.partbyte)):
+            return bytes(value)
+        return tuple([type.internal_type.visit(self, x) for x in value])
+
+    def visit_reference(self, type, value):
+        return self.symbols.resolve(type).visit(self, value)
+
+    def visit_type_alias(self, type, value):
+        return type.type.visit(self, value)
+
+    def visit_structure(self, type, value):
+        cls = getattr(self.modules[self.symbols.owners[id(type)]], type.name)
+        return cls(**dict([(x.name, x.type.visit(self, value[x.name])) for x in type.values()]))
+
+
+class Case(object):
+    def __init__(self, name, module, structure, value, symbols):
+        self.name = name
+        self.module = module
+        self.structure = structure
+        self.value = value
+        self.symbols = symbols
+        self.native = structure.visit(ReferenceEncoder(symbols, "="), value)
+        self.big_endian = structure.visit(ReferenceEncoder(symbols, ">"), value)
+        self.little_endian = structure.visit(ReferenceEncoder(symbols, "<"), value)
+        self.assignments = structure.visit(LeafAssignments(symbols), value, "data")
+
+
+def random_type(rng, references):
+    choice = rng.random()
+    if choice < 0.5 or len(references) == 0:
+        cls, _, _, _ = rng.choice(PRIMITIVES)
+        return cls(rng.choice(["dec", "hex"]))
+    if choice < 0.65:
+        cls, _, _, _ = rng.choice(PRIMITIVES)
+        return protocol_types.Array(cls(), rng.randint(1, 8))
+    if choice < 0.75:
+        # Arrays of aliases and of structures, C backend has no other nested arrays
+        name, referred_module = rng.choice(references)
+        return protocol_types.Array(protocol_types.Reference(name, referred_module), rng.randint(1, 3))
+    name, referred_module = rng.choice(references)
+    return protocol_types.Reference(name, referred_module)
+
+
+def random_protocol(rng, module_count=3, structure_count=3):
+    wire_endianness = rng.choice([None, None, protocol_types.BigEndian, protocol_types.LittleEndian])
+    protocol = protocol_types.Protocol("Fuzz", wire_endianness=wire_endianness)
+    # (name, module) of aliases and structures that can be referenced from later definitions
+    references = []
+
+    for m in range(module_count):
+        module = protocol_types.Module("Module{}".format(m))
+        for imported in protocol.modules:
+            if rng.random() < 0.5:
+                module.add_import(imported)
+        visible = [x for x in references if x[1] is module or x[1] in module.imports]
+
+        module[""] = protocol_types.Line()
+        for c in range(rng.randint(0, 3)):
+            cls, _, low, high = rng.choice(PRIMITIVES)
+            module["constant{}".format(c)] = protocol_types.Constant(rng.randint(max(low, 0), high), cls(rng.choice(["dec", "hex"])))
+
+        for a in range(rng.randint(0, 2)):
+            cls, _, _, _ = rng.choice(PRIMITIVES)
+            name = "Alias{}".format(a)
+            module[name] = protocol_types.TypeAlias(protocol_types.Array(cls(), rng.randint(1, 8)))
+            visible.append((name, module))
+            references.append((name, module))
+
+        for s in range(structure_count):
+            fields = []
+            for f in range(rng.randint(1, 6)):
+                type = random_type(rng, visible)
+                fixed_value = None
+                if primitive_info(type) is not None and rng.random() < 0.1:
+                    _, low, high = primitive_info(type)
+                    fixed_value = rng.randint(max(low, 0), high)
+                fields.append(protocol_types.Field("field{}".format(f), type, fixed_value))
+            name = "Structure{}".format(s)
+            module[""] = protocol_types.Line()
+            attributes = [protocol_types.PackedAttribute()]
+            if rng.random() < 0.3:
+                attributes.append(protocol_types.HotAttribute())
+            module[name] = protocol_types.Structure(attributes=attributes, fields=fields)
+            visible.append((name, module))
+            references.append((name, module))
+
+        protocol.add_module(module)
+    return protocol, protocol_resolution.SymbolTable(protocol.modules)
+
+
+def random_cases(rng, protocol, symbols, values_per_structure=2):
+    cases = []
+    for module in protocol.modules:
+        for name, element in module.items():
+            if not isinstance(element, protocol_types.Structure):
+                continue
+            for i in range(values_per_structure):
+                value = element.visit(RandomValueGenerator(rng, symbols))
+                cases.append(Case("{}_{}_{}".format(module.name, name, i), module, element, value, symbols))
+    return cases
+
+
+def coder_variants(protocol, case):
+    """(suffix of generated coders, output kind, expected encoding) of every coder pair backends generate."""
+    if protocol.wire_endianness == protocol_types.BigEndian:
+        return [("", "be", case.big_endian)]
+    if protocol.wire_endianness == protocol_types.LittleEndian:
+        return [("", "le", case.little_endian)]
+    return [("", "native", case.native), ("_be", "be", case.big_endian)]
+
+
+def c_bytes(data):
+    return "{" + ", ".join(["0x{:02x}".format(x) for x in data]) + "}" if len(data) > 0 else "{0}"
+
+
+def parse_output(output):
+    results = {}
+    for line in output.splitlines():
+        parts = line.split(":")
+        results.setdefault(parts[0], {})[parts[1]] = bytes.fromhex(parts[2])
+    return results
+
+
+def run(command, cwd):
+    process = subprocess.run(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    if process.returncode != 0:
+        raise RuntimeError("Command failed: {}\n{}".format(" ".join(command), process.stdout))
+    return process.stdout
+
+
+class CppBackend(object):
+    name = "cpp"
+
+    def __init__(self):
+        self.compiler = os.environ.get("CXX") or shutil.which("g++") or shutil.which("clang++")
+        self.runs = 0
+
+    def available(self):
+        return self.compiler is not None
+
+    def get_driver(self, protocol, cases):
+        driver =  "#include <cstdio>\n"
+        driver += "".join(['#include "{}_{}.hpp"\n'.format(protocol.name, x.name) for x in protocol.modules])
+        driver += "\n"
+        driver += "static void print(const char* name, const char* kind, const std::uint8_t* begin, const std::uint8_t* end)\n"
+        driver += "{\n"
+        driver += "    std::printf(\"%s:%s:\", name, kind);\n"
+        driver += "    for(; begin != end; ++begin) std::printf(\"%02x\", *begin);\n"
+        driver += "    std::printf(\"\\n\");\n"
+        driver += "}\n\n"
+        driver += "int main()\n{\n"
+        for case in cases:
+            type_name = "{}::{}::{}".format(protocol.name, case.module.name, case.structure.name)
+            namespace = "{}::{}".format(protocol.name, case.module.name)
+            size = len(case.native)
+            driver += "    {\n"
+            driver += "        {} data{{}};\n".format(type_name)
+            driver += "".join(["        {} = {};\n".format(path, literal) for path, literal in case.assignments])
+            driver += "        std::uint8_t buffer[{}] = {{0}};\n".format(size + 1)
+            driver += "        std::uint8_t* end = buffer;\n"
+            driver += "        {} decoded{{}};\n".format(type_name)
+            for suffix, kind, expected in coder_variants(protocol, case):
+                driver += "        end = {}::encode{}(data, buffer);\n".format(namespace, suffix)
+                driver += "        print(\"{}\", \"{}\", buffer, end);\n".format(case.name, kind)
+                driver += self.get_view_checks(case, namespace, type_name, suffix, kind, size)
+                driver += "        {\n"
+                driver += "            const std::uint8_t expected[{}] = {};\n".format(size + 1, c_bytes(expected))
+                driver += "            {}::decode{}(decoded, expected);\n".format(namespace, suffix)
+                driver += "        }\n"
+                driver += "        end = {}::encode{}(decoded, buffer);\n".format(namespace, suffix)
+                driver += "        print(\"{}\", \"{}-roundtrip\", buffer, end);\n".format(case.name, kind)
+            driver += "    }\n"
+        driver += "    return 0;\n"
+        driver += "}\n"
+        return driver
+
+    def get_view_checks(self, case, namespace, type_name, suffix, kind, size):
+        # Fields read through view of encoded buffer, then written through mutable view of empty one and read back
+        fields = list(case.structure.values())
+        checks =  "        {\n"
+        checks += "            {} viewed{{}};\n".format(type_name)
+        checks += "            const {}View view{{ buffer }};\n".format(type_name)
+        checks += "".join(["            viewed.{0} = view.{0}{1}();\n".format(x.name, suffix) for x in fields])
+        checks += "            end = {}::encode{}(viewed, buffer);\n".format(namespace, suffix)
+        checks += "            print(\"{}\", \"{}-view\", buffer, end);\n".format(case.name, kind)
+        checks += "        }\n"
+        checks += "        {\n"
+        checks += "            {} viewed{{}};\n".format(type_name)
+        checks += "            std::uint8_t written[{}] = {{0}};\n".format(size + 1)
+        checks += "            {}MutableView view{{ written }};\n".format(type_name)
+        checks += "".join(["            view.{0}{1}(data.{0});\n".format(x.name, suffix) for x in fields])
+        checks += "            print(\"{}\", \"{}-mutable-view\", written, written + {});\n".format(case.name, kind, size)
+        checks += "".join(["            viewed.{0} = view.{0}{1}();\n".format(x.name, suffix) for x in fields])
+        checks += "            end = {}::encode{}(viewed, buffer);\n".format(namespace, suffix)
+        checks += "            print(\"{}\", \"{}-mutable-view-read\", buffer, end);\n".format(case.name, kind)
+        checks += "        }\n"
+        return checks
+
+    def run(self, protocol, cases, work_dir):
+        # Every other protocol is printed with out-of-line coders and built through unity file
+        out_of_line = self.runs % 2 == 1
+        self.runs += 1
+        protocol_cpp_printer.CppPrinter(protocol, out_of_line=out_of_line, unity=out_of_line).print_to_file(work_dir)
+        shutil.copyfile(os.path.join(os.path.dirname(os.path.abspath(__file__)), "codec", "codec.hpp"),
+                        os.path.join(work_dir, "codec.hpp"))
+        with open(os.path.join(work_dir, "driver.cpp"), "w") as file:
+            file.write(self.get_driver(protocol, cases))
+        sources = ["{}.cpp".format(protocol.name)] if out_of_line else []
+        run([self.compiler, "-std=c++17", "-O1", "-w", "-I.", "driver.cpp"] + sources + ["-o", "driver_cpp"], work_dir)
+        return parse_output(run([os.path.join(work_dir, "driver_cpp")], work_dir))
+
+
+class CBackend(object):
+    name = "c"
+
+    def __init__(self):
+        self.compiler = os.environ.get("CC") or shutil.which("gcc") or shutil.which("clang")
+
+    def available(self):
+        return self.compiler is not None
+
+    def get_driver(self, protocol, cases):
+        # C backend has no coders; packed structures are sent as they are, in native byte order
+        driver =  "#include <stdio.h>\n"
+        driver += "#include <string.h>\n"
+        driver += "".join(['#include "{}_{}.h"\n'.format(protocol.name, x.name) for x in protocol.modules])
+        driver += "\n"
+        driver += "static void print(const char* name, const char* kind, const void* data, size_t size)\n"
+        driver += "{\n"
+        driver += "    const uint8_t* bytes = (const uint8_t*)data;\n"
+        driver += "    printf(\"%s:%s:\", name, kind);\n"
+        driver += "    for(size_t i = 0; i < size; ++i) printf(\"%02x\", bytes[i]);\n"
+        driver += "    printf(\"\\n\");\n"
+        driver += "}\n\n"
+        driver += "int main(void)\n{\n"
+        for case in cases:
+            type_name = "{}_{}".format(case.module.name, case.structure.name)
+            driver += "    {\n"
+            driver += "        {} data;\n".format(type_name)
+            driver += "        memset(&data, 0, sizeof(data));\n"
+            driver += "".join(["        {} = {};\n".format(path, literal) for path, literal in case.assignments])
+            driver += "        print(\"{}\", \"native\", &data, sizeof(data));\n".format(case.name)
+            driver += "    }\n"
+        driver += "    return 0;\n"
+        driver += "}\n"
+        return driver
+
+    def run(self, protocol, cases, work_dir):
+        protocol_c_printer.CPrinter(protocol).print_to_file(work_dir)
+        with open(os.path.join(work_dir, "driver.c"), "w") as file:
+            file.write(self.get_driver(protocol, cases))
+        run([self.compiler, "-std=c99", "-O1", "-w", "-I.", "driver.c", "-o", "driver_c"], work_dir)
+        return parse_output(run([os.path.join(work_dir, "driver_c")], work_dir))
+
+
+class PythonBackend(object):
+    name = "python"
+
+    def available(self):
+        return True
+
+    def run(self, protocol, cases, work_dir):
+        modules = protocol_python_printer.PythonPrinter(protocol).load()
+        results = {}
+        for case in cases:
+            cls = getattr(modules[case.module.name], case.structure.name)
+            data = case.structure.visit(PythonValues(case.symbols, modules), case.value)
+            buffer = bytearray(len(case.native))
+            produced = {}
+            for suffix, kind, expected in coder_variants(protocol, case):
+                getattr(data, "encode" + suffix)(buffer)
+                produced[kind] = bytes(buffer)
+                getattr(getattr(cls, "decode" + suffix)(expected), "encode" + suffix)(buffer)
+                produced[kind + "-roundtrip"] = bytes(buffer)
+            results[case.name] = produced
+        return results
+
+
+BACKENDS = [CppBackend, CBackend, PythonBackend]
+
+
+def check(cases, backend_name, results):
+    errors = []
+    for case in cases:
+        # Kinds are byte order optionally followed by how encoding was reached, e.g. "be-roundtrip" or "le-view"
+        expected = {
+            "native": case.native,
+            "be": case.big_endian,
+            "le": case.little_endian,
+        }
+        produced = results.get(case.name, {})
+        if len(produced) == 0:
+            errors.append("{}: {}: no output".format(backend_name, case.name))
+        for kind, data in produced.items():
+            order = kind.split("-")[0]
+            if data != expected[order]:
+                errors.append("{}: {}: {} mismatch\n    expected: {}\n    produced: {}".format(
+                    backend_name, case.name, kind, expected[order].hex(), data.hex()))
+    return errors
+
+
+def fuzz(seed, iterations, backends, keep=False):
+    errors = []
+    for iteration in range(iterations):
+        rng = random.Random("{}-{}".format(seed, iteration))
+        protocol, symbols = random_protocol(rng)
+        cases = random_cases(rng, protocol, symbols)
+
+        for backend in backends:
+            work_dir = tempfile.mkdtemp(prefix="fuzz_{}_".format(backend.name))
+            try:
+                found = check(cases, backend.name, backend.run(protocol, cases, work_dir))
+            except RuntimeError as e:
+                found = ["{}: {}".format(backend.name, e)]
+            if len(found) > 0:
+                errors += ["iteration {} (seed {}): {}".format(iteration, seed, x) for x in found]
+                print("Failing sources kept in {}".format(work_dir))
+            elif not keep:
+                shutil.rmtree(work_dir)
+    return errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Randomized round-trip check of all locally buildable backends")
+    parser.add_argument("--seed", default=str(random.randrange(1 << 32)))
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep generated sources of passing iterations")
+    args = parser.parse_args()
+
+    backends = [x() for x in BACKENDS]
+    for backend in backends:
+        if not backend.available():
+            print("Skipping {} backend: no compiler found".format(backend.name))
+    backends = [x for x in backends if x.available()]
+
+    print("Seed: {}".format(args.seed))
+    errors = fuzz(args.seed, args.iterations, backends, args.keep)
+    for error in errors:
+        print(error)
+    print("{} errors in {} iterations".format(len(errors), args.iterations))
+    sys.exit(1 if len(errors) > 0 else 0)
@@ -1,11 +1,14 @@
 import printers.protocol_c_printer as protocol_c_printer
 import printers.protocol_c_sharp_printer as protocol_c_sharp_printer
 import printers.protocol_cpp_printer as protocol_cpp_printer
+import printers.protocol_python_printer as protocol_python_printer
+import printers.protocol_report as protocol_report
 import printers.protocol_types as protocol_types
 
 import ethernet.ethernet as ethernet
 import ethernet.arp as arp
 
+import argparse
 import os
 from shutil import copyfile
 
@@ -13,13 +16,30 @@ from shutil import copyfile
 ethernet_protocol = protocol_types.Protocol("EthernetProtocol", [
     ethernet.Ethernet,
     arp.ARP,
-])
+], wire_endianness=protocol_types.BigEndian)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instrumentation", choices=["counters", "timing"], default=None,
+                        help="emit per-structure counters (and cycle timing) into C++ coders")
+    parser.add_argument("--out-of-line", action="store_true",
+                        help="define C++ coders of structures without HotAttribute in .cpp file of each module")
+    parser.add_argument("--unity", action="store_true",
+                        help="with --out-of-line, also print single .cpp file including all module sources")
+    parser.add_argument("--report", action="store_true",
+                        help="print lines, functions, codec instantiations and estimated object size of every output file")
+    parser.add_argument("--compile", action="store_true",
+                        help="also compile every printed C and C++ file alone and print wall time, implies --report")
+    args = parser.parse_args()
+    if args.unity and not args.out_of_line:
+        parser.error("--unity requires --out-of-line")
+    args.report = args.report or args.compile
+
     cs_output_dir = os.path.join("out", "cs")
     c_output_dir = os.path.join("out", "c")
     cpp_output_dir = os.path.join("out", "cpp")
+    py_output_dir = os.path.join("out", "py")
 
     try: os.makedirs(cs_output_dir)
     except: pass
@@ -27,8 +47,26 @@ if __name__ == "__main__":
     except: pass
     try: os.makedirs(cpp_output_dir)
     except: pass
+    try: os.makedirs(py_output_dir)
+    except: pass
         
-    protocol_c_sharp_printer.CSharpPrinter(ethernet_protocol).print_to_file(cs_output_dir)
-    protocol_cpp_printer.CppPrinter(ethernet_protocol).print_to_file(cpp_output_dir)
-    protocol_c_printer.CPrinter(ethernet_protocol).print_to_file(c_output_dir)
+    printers = [
+        (protocol_c_sharp_printer.CSharpPrinter(ethernet_protocol), cs_output_dir),
+        (protocol_cpp_printer.CppPrinter(ethernet_protocol, args.instrumentation, args.out_of_line, args.unity), cpp_output_dir),
+        (protocol_c_printer.CPrinter(ethernet_protocol), c_output_dir),
+        (protocol_python_printer.PythonPrinter(ethernet_protocol), py_output_dir),
+    ]
+    for printer, output_dir in printers:
+        printer.print_to_file(output_dir)
     copyfile(os.path.join("codec", "codec.hpp"), os.path.join(cpp_output_dir, "codec.hpp"))
+    if args.instrumentation is not None:
+        copyfile(os.path.join("codec", "codec_stats.hpp"), os.path.join(cpp_output_dir, "codec_stats.hpp"))
+
+    if args.report:
+        reports = []
+        for printer, output_dir in printers:
+            printer_reports = protocol_report.report(printer)
+            if args.compile:
+                protocol_report.time_compilation(printer_reports, output_dir)
+            reports += printer_reports
+        print(protocol_report.format_reports(reports))
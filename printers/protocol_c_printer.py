@@ -1,5 +1,7 @@
 from . import protocol_types as types
 from . import protocol_printer as printer
+from . import protocol_enum
+from . import protocol_hash
 
 
 def tab(tabs=1):
@@ -50,8 +52,10 @@ class CValuePrinter(object):
 
 
 class CTypePrinter(object):
-    def __init__(self, module=""):
+    def __init__(self, module="", layout_hasher=None, wire_endianness=None):
         self.current_module = module
+        self.layout_hasher = layout_hasher
+        self.wire_endianness = wire_endianness
 
     def add_module(self, name):
         return "{}_{}".format(self.current_module, name)
@@ -133,8 +137,55 @@ class CTypePrinter(object):
                 type.type.visit(CValuePrinter(), type.value)
             )
 
+    def visit_enum(self, type):
+        name = self.add_module(type.name)
+        underlying = type.type.visit(self)
+        table = protocol_enum.EnumTable(type)
+
+        definition  = "\n"
+        definition += "typedef enum {}\n".format(name)
+        definition += "{\n"
+        definition += "".join(["{}{}_{} = {},\n".format(tab(), name, x, type.type.visit(CValuePrinter(), value))
+                               for x, value in type.items()])
+        definition += "}} {};\n".format(name)
+        definition += "\n"
+
+        # NULL for values that are not in enum
+        definition += "static inline const char* {}_name({} value)\n".format(name, underlying)
+        definition += "{\n"
+        definition += tab() + "static const char* const names[{}] = {{ {} }};\n".format(
+            len(table.slots), ", ".join(['"{}"'.format(x) if x is not None else "NULL" for x in table.names()]))
+        definition += tab() + "const int64_t offset = (int64_t)value - {};\n".format(table.base)
+        if table.is_dense:
+            definition += tab() + "return offset >= 0 && offset < {} ? names[offset] : NULL;\n".format(len(table.slots))
+        else:
+            definition += tab() + "static const {} values[{}] = {{ {} }};\n".format(
+                underlying, len(table.slots), ", ".join([str(x) if x is not None else "0" for x in table.values()]))
+            definition += tab() + "const size_t index = (size_t)((uint64_t)offset % {}u);\n".format(table.modulus)
+            definition += tab() + "return values[index] == value ? names[index] : NULL;\n"
+        definition += "}\n"
+        definition += "\n"
+
+        definition += "static inline int {0}_from_value({1} value, {0}* result)\n".format(name, underlying)
+        definition += "{\n"
+        definition += tab() + "if({}_name(value) == NULL)\n".format(name)
+        definition += tab() + "{\n"
+        definition += tab(2) + "return 0;\n"
+        definition += tab() + "}\n"
+        definition += tab() + "*result = ({})value;\n".format(name)
+        definition += tab() + "return 1;\n"
+        definition += "}\n"
+        return definition
+
     def visit_field(self, type):
-        definition = "{} {};".format(type.type.visit(self), type.name)
+        if isinstance(type.type, types.Array):
+            definition = "{} {}[{}];".format(
+                type.type.internal_type.visit(self),
+                type.name,
+                self.print_value(type.type.size)
+            )
+        else:
+            definition = "{} {};".format(type.type.visit(self), type.name)
         if type.value is not None:
             definition += types.LineComment(
                 "Must be: {}".format(self.print_value(type.value))
@@ -144,11 +195,78 @@ class CTypePrinter(object):
 
     def visit_structure(self, type):
         definition = "typedef struct {}\n{{\n".format(
-            " ".join([x.visit(self) for x in type.attributes]))
+            " ".join([x.visit(self) for x in type.attributes if x.visit(self) is not None]))
         for field in type.values():
             definition += "{}{}".format(tab(), field.visit(self))
 
         definition += "}} {};\n".format(self.add_module(type.name))
+        if self.layout_hasher is not None:
+            definition += "#define {}_layoutHash (uint64_t)0x{:016x}ull\n".format(
+                self.add_module(type.name), self.layout_hasher.hash(type))
+        return definition
+
+    def get_field_load(self, layer, structure, field):
+        # Statements reading scalar field of layer into local variable, in wire byte order
+        sizer = protocol_hash.LayoutSizer(self.layout_hasher)
+        owner = self.layout_hasher.symbols.owners[id(structure)]
+        offset = 0
+        for x in structure.values():
+            if x.name == field:
+                break
+            offset += sizer.size(x.type, owner)
+        field_type = structure[field].type
+        size = sizer.size(field_type, owner)
+        c_type = field_type.visit(self)
+        position = "buffer + layers->{} + {}".format(layer.name, offset)
+        if self.wire_endianness is None:
+            return ["{} {};".format(c_type, field), "memcpy(&{0}, {1}, {2});".format(field, position, size)]
+        shifts = [8 * (size - 1 - x) if self.wire_endianness == types.BigEndian else 8 * x for x in range(size)]
+        return [
+            "const uint8_t* const {}_data = {};".format(field, position),
+            "const {0} {1} = ({0})({2});".format(c_type, field, " | ".join(
+                ["((uint32_t){}_data[{}] << {})".format(field, x, shift) if shift > 0 else "(uint32_t){}_data[{}]".format(field, x)
+                 for x, shift in enumerate(shifts)])),
+        ]
+
+    def visit_encapsulation(self, type):
+        name = self.add_module(type.name)
+        layers = [(x, self.layout_hasher.symbols.resolve(x.type, self.current_module)) for x in type.layers]
+        sizer = protocol_hash.LayoutSizer(self.layout_hasher)
+        sizes = [sizer.size(x.type, self.current_module) for x in type.layers]
+
+        # Offsets of layers in buffer, filled by parse function that checks whole stack at once.
+        # Sizes are those of encoded layers, in-memory structures may have padding.
+        definition  = "typedef struct {}\n".format(name)
+        definition += "{\n"
+        definition += "".join(["{}uint16_t {};\n".format(tab(), x.name) for x in type.layers])
+        definition += tab() + "uint16_t payload;\n"
+        definition += "}} {};\n".format(name)
+        definition += "#define {}_wireSize ({})\n".format(name, " + ".join([str(x) for x in sizes]))
+        definition += "\n"
+
+        definition += "static inline int {0}_parse({0}* layers, const uint8_t* buffer, size_t size)\n".format(name)
+        definition += "{\n"
+        definition += tab() + "if(size < {}_wireSize)\n".format(name)
+        definition += tab() + "{\n"
+        definition += tab(2) + "return 0;\n"
+        definition += tab() + "}\n"
+        offset = "0"
+        for (layer, structure), size in zip(layers, sizes):
+            definition += tab() + "layers->{} = {};\n".format(layer.name, offset)
+            offset = "(uint16_t)(layers->{} + {})".format(layer.name, size)
+        definition += tab() + "layers->payload = {};\n".format(offset)
+        for (previous, previous_structure), (layer, structure) in zip(layers, layers[1:]):
+            if layer.field is None:
+                continue
+            definition += tab() + "{\n"
+            definition += "".join([tab(2) + x + "\n" for x in self.get_field_load(previous, previous_structure, layer.field)])
+            definition += tab(2) + "if({} != {})\n".format(layer.field, self.print_value(layer.value))
+            definition += tab(2) + "{\n"
+            definition += tab(3) + "return 0;\n"
+            definition += tab(2) + "}\n"
+            definition += tab() + "}\n"
+        definition += tab() + "return 1;\n"
+        definition += "}\n"
         return definition
 
     def visit_packed_attribute(self, attr):
@@ -161,7 +279,10 @@ class CTypePrinter(object):
         return "/* {} */".format(comment.text)
 
     def visit_module(self, module):
-        return "\n".join([x.visit(CTypePrinter(module.name)) for x in module.values()])
+        content = ""
+        if self.layout_hasher is not None:
+            content += "#define {}_layoutHash (uint64_t)0x{:016x}ull\n".format(module.name, self.layout_hasher.hash(module))
+        return content + "\n".join([x.visit(CTypePrinter(module.name, self.layout_hasher, self.wire_endianness)) for x in module.values()])
 
 
 class CPrinter(printer.ProtocolPrinter):
@@ -169,7 +290,7 @@ class CPrinter(printer.ProtocolPrinter):
         super(CPrinter, self).__init__(protocol)
 
     def _get_module_content(self, module):
-        return self._print_header(module) + module.visit(CTypePrinter())
+        return self._print_header(module) + module.visit(CTypePrinter("", self.layout_hasher, self.wire_endianness(module)))
 
     def _get_module_file_format(self):
         return self.protocol.name + "_" + "{}.h"
@@ -182,6 +303,9 @@ class CPrinter(printer.ProtocolPrinter):
         header =  "#pragma once\n\n"
         header += "#include <stdint.h>\n"
         header += "#include <stddef.h>\n"
+        # memcpy loads selector fields of encapsulations in native byte order
+        if self.wire_endianness(module) is None and any([isinstance(x, types.Encapsulation) for x in module.values()]):
+            header += "#include <string.h>\n"
         header += self._print_imports(module.imports)
         header += "\n"
         header += "#ifndef PACKED\n"
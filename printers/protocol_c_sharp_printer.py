@@ -1,5 +1,6 @@
 from . import protocol_types as types
 from . import protocol_printer as printer
+from . import protocol_enum
 
 
 def tab(tabs=1):
@@ -70,9 +71,10 @@ class CSharpMarshalAsPrinter(object):
 
 
 class CSharpTypePrinter(object):
-    def __init__(self, module="", indent=0):
+    def __init__(self, module="", indent=0, layout_hasher=None):
         self.current_module = module
         self.indent = 0
+        self.layout_hasher = layout_hasher
 
     def visit_unknown(self):
         raise NotImplementedError()
@@ -145,6 +147,45 @@ class CSharpTypePrinter(object):
             type.type.visit(CSharpValuePrinter(), type.value, self.indent)
         )
 
+    def visit_enum(self, type):
+        underlying = type.type.visit(self)
+        table = protocol_enum.EnumTable(type)
+
+        definition  = "\n"
+        definition += "{}public enum {} : {}\n".format(tab(self.indent), type.name, underlying)
+        definition += tab(self.indent) + "{\n"
+        definition += "".join(["{}{} = {},\n".format(tab(self.indent + 1), name, type.type.visit(CSharpValuePrinter(), value, self.indent))
+                               for name, value in type.items()])
+        definition += tab(self.indent) + "}\n"
+        definition += "\n"
+
+        definition += "{}private static readonly string[] {}_names = {{ {} }};\n".format(
+            tab(self.indent), type.name, ", ".join(['"{}"'.format(x) if x is not None else "null" for x in table.names()]))
+        if not table.is_dense:
+            definition += "{}private static readonly {}[] {}_values = {{ {} }};\n".format(
+                tab(self.indent), underlying, type.name, ", ".join([str(x) if x is not None else "0" for x in table.values()]))
+        definition += "\n"
+
+        # null for values that are not in enum
+        definition += "{}public static string {}_name({} value)\n".format(tab(self.indent), type.name, underlying)
+        definition += tab(self.indent) + "{\n"
+        definition += tab(self.indent + 1) + "long offset = (long)value - {};\n".format(table.base)
+        if table.is_dense:
+            definition += tab(self.indent + 1) + "return offset >= 0 && offset < {0} ? {1}_names[offset] : null;\n".format(
+                len(table.slots), type.name)
+        else:
+            definition += tab(self.indent + 1) + "ulong index = unchecked((ulong)offset) % {}UL;\n".format(table.modulus)
+            definition += tab(self.indent + 1) + "return {0}_values[index] == value ? {0}_names[index] : null;\n".format(type.name)
+        definition += tab(self.indent) + "}\n"
+        definition += "\n"
+
+        definition += "{0}public static bool {1}_from_value({2} value, out {1} result)\n".format(tab(self.indent), type.name, underlying)
+        definition += tab(self.indent) + "{\n"
+        definition += tab(self.indent + 1) + "result = ({})value;\n".format(type.name)
+        definition += tab(self.indent + 1) + "return {}_name(value) != null;\n".format(type.name)
+        definition += tab(self.indent) + "}\n"
+        return definition
+
     def visit_typedef(self, type):
         # C# type aliases are only visible in file-scope, so typedef is not very useful.
         # If typedef is used Reference, full type will be printed
@@ -184,12 +225,15 @@ class CSharpTypePrinter(object):
 
     def visit_structure(self, type):
         # attributes
-        definition =  "".join([x.visit(self) + "\n" for x in type.attributes])
+        definition =  "".join([x.visit(self) + "\n" for x in type.attributes if x.visit(self) is not None])
         definition += "public struct {}\n".format(type.name)
         definition += "{\n"
         # fields
         for field in type.values():
             definition += field.visit(CSharpTypePrinter.PrintFieldsStorage(self), self.indent + 1)
+        if self.layout_hasher is not None:
+            definition += "{}public const ulong layoutHash = 0x{:016x}UL;\n".format(
+                tab(self.indent + 1), self.layout_hasher.hash(type))
         definition += "\n"
         # ctor
         definition += "{}public {}({})\n".format(tab(), type.name, ", ".join( \
@@ -200,6 +244,10 @@ class CSharpTypePrinter(object):
         definition += "}\n"
         return definition
 
+    def visit_encapsulation(self, type):
+        # Fused parsers are generated only for C and C++
+        return ""
+
     def visit_packed_attribute(self, attr):
         return tab(self.indent) + "[StructLayout(LayoutKind.Sequential, Pack=1)]"
 
@@ -212,7 +260,9 @@ class CSharpTypePrinter(object):
     def visit_module(self, module):
         content =  "internal static class {}\n".format(module.name)
         content += "{"
-        content += "\n".join([x.visit(CSharpTypePrinter(module.name, 0)) for x in module.values()])
+        if self.layout_hasher is not None:
+            content += "\npublic const ulong layoutHash = 0x{:016x}UL;".format(self.layout_hasher.hash(module))
+        content += "\n".join([x.visit(CSharpTypePrinter(module.name, 0, self.layout_hasher)) for x in module.values()])
         content += "\n}"
         return content
 
@@ -222,7 +272,7 @@ class CSharpPrinter(printer.ProtocolPrinter):
         super(CSharpPrinter, self).__init__(protocol)
 
     def _get_module_content(self, module):
-        return self._print_header() + module.visit(CSharpTypePrinter()) + self._print_ending()
+        return self._print_header() + module.visit(CSharpTypePrinter("", 0, self.layout_hasher)) + self._print_ending()
 
     def _get_module_file_format(self):
         return self.protocol.name + "_" + "{}.cs"
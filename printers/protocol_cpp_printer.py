@@ -1,5 +1,6 @@
 from . import protocol_types as types
 from . import protocol_printer as printer
+from . import protocol_enum
 
 
 def tab(tabs=1):
@@ -52,8 +53,23 @@ class CppValuePrinter(object):
 
 
 class CppTypePrinter(object):
-    def __init__(self, module=""):
+    def __init__(self, module="", instrumentation=None, layout_hasher=None, wire_endianness=None, out_of_line=False):
         self.current_module = module
+        self.instrumentation = instrumentation
+        self.layout_hasher = layout_hasher
+        self.wire_endianness = wire_endianness
+        self.out_of_line = out_of_line
+
+    def is_out_of_line(self, type):
+        return self.out_of_line and not any([isinstance(x, types.HotAttribute) for x in type.attributes])
+
+    def coder_variants(self):
+        # (suffix of generated function, suffix of codec function it uses)
+        if self.wire_endianness == types.BigEndian:
+            return [("", "_be")]
+        if self.wire_endianness == types.LittleEndian:
+            return [("", "_le")]
+        return [("", ""), ("_be", "_be")]
 
     def visit_unknown(self):
         raise NotImplementedError()
@@ -118,9 +134,48 @@ class CppTypePrinter(object):
             type.type.visit(CppValuePrinter(), type.value)
         )
 
+    def visit_enum(self, type):
+        underlying = type.type.visit(self) if not isinstance(type.type, types.partbyte) else "std::uint8_t"
+        table = protocol_enum.EnumTable(type)
+
+        definition  = "\n"
+        definition += "enum class {} : {}\n".format(type.name, underlying)
+        definition += "{\n"
+        definition += "".join(["{}{} = {},\n".format(tab(), name, type.type.visit(CppValuePrinter(), value))
+                               for name, value in type.items()])
+        definition += "};\n"
+        definition += "\n"
+
+        # nullptr for values that are not in enum
+        definition += "constexpr const char* to_string({} value)\n".format(type.name)
+        definition += "{\n"
+        definition += tab() + "constexpr const char* names[{}] = {{ {} }};\n".format(
+            len(table.slots), ", ".join(['"{}"'.format(x) if x is not None else "nullptr" for x in table.names()]))
+        definition += tab() + "const std::int64_t offset = static_cast<std::int64_t>(value) - {};\n".format(table.base)
+        if table.is_dense:
+            definition += tab() + "return offset >= 0 && offset < {} ? names[offset] : nullptr;\n".format(len(table.slots))
+        else:
+            definition += tab() + "constexpr {} values[{}] = {{ {} }};\n".format(
+                underlying, len(table.slots), ", ".join([str(x) if x is not None else "0" for x in table.values()]))
+            definition += tab() + "const std::size_t index = static_cast<std::uint64_t>(offset) % {}u;\n".format(table.modulus)
+            definition += tab() + "return values[index] == static_cast<{}>(value) ? names[index] : nullptr;\n".format(underlying)
+        definition += "}\n"
+        definition += "\n"
+
+        definition += "constexpr bool from_value({} value, {}& result)\n".format(underlying, type.name)
+        definition += "{\n"
+        definition += tab() + "if(to_string(static_cast<{}>(value)) == nullptr)\n".format(type.name)
+        definition += tab() + "{\n"
+        definition += tab(2) + "return false;\n"
+        definition += tab() + "}\n"
+        definition += tab() + "result = static_cast<{}>(value);\n".format(type.name)
+        definition += tab() + "return true;\n"
+        definition += "}\n"
+        return definition
+
     def visit_field(self, type):
         if type.value is None:
-            definition = "{} {};".format(
+            definition = "{} {}{{}};".format(
                 type.type.visit(self),
                 type.name)
         else:
@@ -141,7 +196,7 @@ class CppTypePrinter(object):
         definition =  tab() + "{}() = default;\n".format(type.name)
         non_default_fields = [x for x in type.values() if x.value is None]
         if len(non_default_fields) > 0:
-            definition += tab() + "{}({}) :\n{}{}\n".format(
+            definition += tab() + "constexpr {}({}) :\n{}{}\n".format(
                 type.name,
                 ", ".join([argument(x) for x in non_default_fields]),
                 tab(2),
@@ -150,45 +205,179 @@ class CppTypePrinter(object):
             definition += tab() + "{}\n"
         return definition
 
-    def get_structure_coder(self, type):
-        definition  = "inline std::uint8_t* encode(const {}& data, std::uint8_t* buffer)\n".format(type.name);
-        definition += "{\n";
+    def get_coder_function(self, type, signature, call, operation, specifier):
+        # Counting is skipped in constant evaluation, so instrumented coders stay constexpr
+        instrumented = self.instrumentation is not None
+        definition  = specifier + signature.format(type.name) + "\n"
+        definition += "{\n"
+        if self.instrumentation == "timing":
+            definition += tab() + "const std::uint64_t start = codec::detail::is_constant_evaluated() ? 0 : codec::stats::cycles();\n"
+        if instrumented:
+            definition += tab() + "const std::uint8_t* const begin = buffer;\n"
         for field in type.values():
-            definition += tab() + "buffer = codec::encode_any(data.{}, buffer);\n".format(field.name)
-        definition += tab() + "return buffer;\n";
-        definition += "}\n";
+            definition += tab() + "buffer = codec::{}(data.{}, buffer);\n".format(call, field.name)
+        if instrumented:
+            definition += tab() + "if(!codec::detail::is_constant_evaluated())\n"
+            definition += tab() + "{\n"
+            if self.instrumentation == "timing":
+                definition += tab(2) + "codec::stats::count({}_stats.{}, buffer - begin, start);\n".format(type.name, operation)
+            else:
+                definition += tab(2) + "codec::stats::count({}_stats.{}, buffer - begin);\n".format(type.name, operation)
+            definition += tab() + "}\n"
+        definition += tab() + "return buffer;\n"
+        definition += "}\n"
+        return definition
+
+    def get_coder_signatures(self):
+        # (signature, codec function it uses, operation)
+        signatures = []
+        for suffix, call_suffix in self.coder_variants():
+            signatures.append(("std::uint8_t* encode" + suffix + "(const {}& data, std::uint8_t* buffer)",
+                               "encode_any" + call_suffix, "encode" + suffix))
+            signatures.append(("const std::uint8_t* decode" + suffix + "({}& data, const std::uint8_t* buffer)",
+                               "decode_any" + call_suffix, "decode" + suffix))
+        return signatures
 
-        definition += "inline const std::uint8_t* decode({}& data, const std::uint8_t* buffer)\n".format(type.name);
-        definition += "{\n";
+    def get_structure_coder(self, type):
+        definition = ""
+        if self.instrumentation is not None:
+            definition += "inline codec::stats::Counters {}_stats{{ \"{}::{}\" }};\n".format(
+                type.name, self.current_module, type.name)
+        if self.is_out_of_line(type):
+            # Definitions are in source file of module, see get_structure_definitions
+            for signature, _, _ in self.get_coder_signatures():
+                definition += signature.format(type.name) + ";\n"
+            return definition
+        for signature, call, operation in self.get_coder_signatures():
+            definition += self.get_coder_function(type, signature, call, operation, "constexpr ")
+        return definition
+
+    def get_structure_definitions(self, type):
+        if not self.is_out_of_line(type):
+            return ""
+        return "".join([self.get_coder_function(type, signature, call, operation, "")
+                        for signature, call, operation in self.get_coder_signatures()])
+
+    def get_wire_size(self, type):
+        sizes = ["codec::wire_size_v<{}>".format(x.type.visit(self)) for x in type.values()]
+        return tab() + "static constexpr std::size_t wireSize = {};\n".format(
+            " + ".join(sizes) if len(sizes) > 0 else "0")
+
+    def get_view_getters(self, type, view_name):
+        definition = ""
         for field in type.values():
-            definition += tab() + "buffer = codec::decode_any(data.{}, buffer);\n".format(field.name)
-        definition += tab() + "return buffer;\n";
-        definition += "}\n";
+            for suffix, call_suffix in self.coder_variants():
+                definition += tab() + "constexpr {} {}{}() const\n".format(field.type.visit(self), field.name, suffix)
+                definition += tab() + "{\n"
+                definition += tab(2) + "{} x{{}};\n".format(field.type.visit(self))
+                definition += tab(2) + "codec::decode_any{}(x, buffer_ + {}::{}_offset);\n".format(
+                    call_suffix, view_name, field.name)
+                definition += tab(2) + "return x;\n"
+                definition += tab() + "}\n"
+        return definition
 
-        definition += "inline std::uint8_t* encode_be(const {}& data, std::uint8_t* buffer)\n".format(type.name);
-        definition += "{\n";
+    def get_view_setters(self, type, view_name):
+        definition = ""
         for field in type.values():
-            definition += tab() + "buffer = codec::encode_any_be(data.{}, buffer);\n".format(field.name)
-        definition += tab() + "return buffer;\n";
-        definition += "}\n";
+            for suffix, call_suffix in self.coder_variants():
+                definition += tab() + "constexpr void {}{}(const {}& x)\n".format(field.name, suffix, field.type.visit(self))
+                definition += tab() + "{\n"
+                definition += tab(2) + "codec::encode_any{}(x, const_cast<std::uint8_t*>(buffer_) + {}::{}_offset);\n".format(
+                    call_suffix, view_name, field.name)
+                definition += tab() + "}\n"
+        return definition
+
+    def get_structure_view(self, type):
+        # Views access single fields directly in encoded buffer, without decoding whole structure
+        view_name = "{}View".format(type.name)
+        mutable_view_name = "{}MutableView".format(type.name)
 
-        definition += "inline const std::uint8_t* decode_be({}& data, const std::uint8_t* buffer)\n".format(type.name);
-        definition += "{\n";
+        definition = "struct {}\n{{\n".format(view_name)
+        previous = None
         for field in type.values():
-            definition += tab() + "buffer = codec::decode_any_be(data.{}, buffer);\n".format(field.name)
-        definition += tab() + "return buffer;\n";
-        definition += "}\n";
-        return definition;
+            if previous is None:
+                offset = "0"
+            else:
+                offset = "{}_offset + codec::wire_size_v<{}>".format(previous.name, previous.type.visit(self))
+            definition += tab() + "static constexpr std::size_t {}_offset = {};\n".format(field.name, offset)
+            previous = field
+        definition += "\n"
+        # Trailing underscore keeps buffer apart from getters named after fields
+        definition += tab() + "const std::uint8_t* buffer_;\n"
+        definition += "\n"
+        definition += tab() + "constexpr explicit {}(const std::uint8_t* buffer) : buffer_{{ buffer }} {{}}\n".format(view_name)
+        definition += "\n"
+        definition += self.get_view_getters(type, view_name)
+        definition += "};\n"
+        definition += "\n"
+
+        # Only constructible from mutable buffer, so setters may cast constness of inherited pointer away
+        definition += "struct {} : {}\n{{\n".format(mutable_view_name, view_name)
+        definition += tab() + "constexpr explicit {}(std::uint8_t* buffer) : {}{{ buffer }} {{}}\n".format(mutable_view_name, view_name)
+        definition += "\n"
+        definition += "".join([tab() + "using {}::{}{};\n".format(view_name, x.name, suffix)
+                               for x in type.values() for suffix, _ in self.coder_variants()])
+        definition += "\n"
+        definition += self.get_view_setters(type, view_name)
+        definition += "};\n"
+        return definition
 
     def visit_structure(self, type):
         definition = "struct {}\n{{\n".format(type.name)
         for field in type.values():
             definition += "{}{}".format(tab(), field.visit(self))
         definition += "\n"
+        definition += self.get_wire_size(type)
+        if self.wire_endianness is not None:
+            definition += tab() + "static constexpr codec::endian wireEndianness = codec::endian::{};\n".format(
+                self.wire_endianness)
+        if self.layout_hasher is not None:
+            definition += tab() + "static constexpr std::uint64_t layoutHash = 0x{:016x}ull;\n".format(
+                self.layout_hasher.hash(type))
+        definition += "\n"
         definition += self.get_constructor(type)
-        definition += "}} {};\n".format(" ".join([x.visit(self) for x in type.attributes]))
+        definition += "}} {};\n".format(" ".join([x.visit(self) for x in type.attributes if x.visit(self) is not None]))
         definition += "\n"
         definition += self.get_structure_coder(type)
+        definition += "\n"
+        definition += self.get_structure_view(type)
+        return definition
+
+    def visit_encapsulation(self, type):
+        # Offsets of layers in buffer, filled by parse() that checks whole stack at once
+        definition = "struct {}\n{{\n".format(type.name)
+        for layer in type.layers:
+            definition += tab() + "std::uint16_t {}{{}};\n".format(layer.name)
+        definition += tab() + "std::uint16_t payload{};\n"
+        definition += "\n"
+        definition += tab() + "static constexpr std::size_t wireSize = {};\n".format(
+            " + ".join(["codec::wire_size_v<{}>".format(x.type.visit(self)) for x in type.layers]))
+        definition += tab() + "static_assert(wireSize <= 0xffff, \"Layer offsets do not fit std::uint16_t\");\n"
+        definition += "};\n"
+        definition += "\n"
+
+        definition += "constexpr bool parse({}& layers, const std::uint8_t* buffer, std::size_t size)\n".format(type.name)
+        definition += "{\n"
+        definition += tab() + "if(size < {}::wireSize)\n".format(type.name)
+        definition += tab() + "{\n"
+        definition += tab(2) + "return false;\n"
+        definition += tab() + "}\n"
+        offset = "0"
+        for layer in type.layers:
+            definition += tab() + "layers.{} = {};\n".format(layer.name, offset)
+            offset = "static_cast<std::uint16_t>(layers.{} + codec::wire_size_v<{}>)".format(layer.name, layer.type.visit(self))
+        definition += tab() + "layers.payload = {};\n".format(offset)
+        previous = None
+        for layer in type.layers:
+            if layer.field is not None:
+                definition += tab() + "if({}View{{ buffer + layers.{} }}.{}() != {})\n".format(
+                    previous.type.visit(self), previous.name, layer.field, self.print_value(layer.value))
+                definition += tab() + "{\n"
+                definition += tab(2) + "return false;\n"
+                definition += tab() + "}\n"
+            previous = layer
+        definition += tab() + "return true;\n"
+        definition += "}\n"
         return definition
 
     def visit_packed_attribute(self, attr):
@@ -203,17 +392,63 @@ class CppTypePrinter(object):
     def visit_module(self, module):
         content =  "namespace {}\n".format(module.name)
         content += "{\n"
-        content += "\n".join([x.visit(CppTypePrinter(module.name)) for x in module.values()])
+        if self.layout_hasher is not None:
+            content += "constexpr std::uint64_t layoutHash = 0x{:016x}ull;\n".format(self.layout_hasher.hash(module))
+        content += "\n".join([x.visit(CppTypePrinter(module.name, self.instrumentation, self.layout_hasher, self.wire_endianness, self.out_of_line))
+                               for x in module.values()])
+        content += "}\n"
+        return content
+
+    def get_module_definitions(self, module):
+        type_printer = CppTypePrinter(module.name, self.instrumentation, self.layout_hasher, self.wire_endianness, self.out_of_line)
+        definitions = [type_printer.get_structure_definitions(x) for x in module.values() if isinstance(x, types.Structure)]
+        content =  "namespace {}\n".format(module.name)
+        content += "{\n"
+        content += "\n".join([x for x in definitions if x != ""])
         content += "}\n"
         return content
 
 
 class CppPrinter(printer.ProtocolPrinter):
-    def __init__(self, protocol):
+    # instrumentation: None, "counters" (calls and bytes per structure) or "timing" (counters and cycles)
+    # out_of_line: coders of structures without HotAttribute are only declared in header and defined in .cpp file
+    # unity: with out_of_line, also print <protocol>.cpp including sources of all modules
+    def __init__(self, protocol, instrumentation=None, out_of_line=False, unity=False):
         super(CppPrinter, self).__init__(protocol)
+        assert instrumentation in (None, "counters", "timing")
+        assert out_of_line or not unity
+        self.instrumentation = instrumentation
+        self.out_of_line = out_of_line
+        self.unity = unity
+
+    def _type_printer(self, module):
+        return CppTypePrinter("", self.instrumentation, self.layout_hasher, self.wire_endianness(module), self.out_of_line)
 
     def _get_module_content(self, module):
-        return self._print_header(module) + module.visit(CppTypePrinter()) + self._print_ending()
+        return self._print_header(module) + module.visit(self._type_printer(module)) + self._print_ending()
+
+    def _get_module_source_file_format(self):
+        return self.protocol.name + "_" + "{}.cpp"
+
+    def _get_module_extra_files(self, module):
+        type_printer = self._type_printer(module)
+        if not any([type_printer.is_out_of_line(x) for x in module.values() if isinstance(x, types.Structure)]):
+            return []
+        content =  "#include \"{}\"\n".format(self._get_module_file_format().format(module.name))
+        content += "\n\n"
+        content += "namespace {}\n".format(self.protocol.name)
+        content += "{\n"
+        content += type_printer.get_module_definitions(module)
+        content += self._print_ending()
+        return [(self._get_module_source_file_format().format(module.name), content)]
+
+    def _get_protocol_extra_files(self):
+        if not self.unity:
+            return []
+        # Named after protocol only, so it cannot collide with source file of any module
+        content = "".join(['#include "{}"\n'.format(file_name)
+                           for x in self.modules() for file_name, _ in self._get_module_extra_files(x)])
+        return [(self.protocol.name + ".cpp", content)]
 
     def _get_module_file_format(self):
         return self.protocol.name + "_" + "{}.hpp"
@@ -227,6 +462,8 @@ class CppPrinter(printer.ProtocolPrinter):
         header += "#include <cstdint>\n"
         header += "#include <array>\n"
         header += "#include \"codec.hpp\"\n"
+        if self.instrumentation is not None:
+            header += "#include \"codec_stats.hpp\"\n"
         header += self._print_imports(module.imports)
         header += "\n\n"
         header += "namespace {}\n".format(self.protocol.name)
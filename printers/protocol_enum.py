@@ -0,0 +1,52 @@
+class EnumTable(object):
+    """Value -> name lookup table of an enum, shared by all printers.
+
+    Index of value is (value - base) for dense tables and (value - base) % modulus for sparse ones.
+    Dense table is used when values are close to each other, otherwise smallest modulus
+    that gives every value its own slot is searched (perfect hash).
+    Slots are (value, name) pairs, unused slots are (None, None).
+    """
+
+    max_dense_ratio = 4
+    min_dense_size = 16
+
+    def __init__(self, enum):
+        by_value = {}
+        for name, value in enum.items():
+            by_value.setdefault(value, name)
+
+        self.base = min(by_value)
+        offsets = sorted([x - self.base for x in by_value])
+        span = offsets[-1] + 1
+        if span <= max(self.max_dense_ratio * len(offsets), self.min_dense_size):
+            self.modulus = None
+            size = span
+        else:
+            self.modulus = self._find_modulus(offsets)
+            size = self.modulus
+
+        self.slots = [(None, None)] * size
+        for value, name in by_value.items():
+            self.slots[self.index(value)] = (value, name)
+
+    @staticmethod
+    def _find_modulus(offsets):
+        # Modulus equal to span always works, as all offsets are smaller than it
+        modulus = len(offsets)
+        while len(set([x % modulus for x in offsets])) != len(offsets):
+            modulus += 1
+        return modulus
+
+    @property
+    def is_dense(self):
+        return self.modulus is None
+
+    def index(self, value):
+        offset = value - self.base
+        return offset if self.is_dense else offset % self.modulus
+
+    def names(self):
+        return [x[1] for x in self.slots]
+
+    def values(self):
+        return [x[0] for x in self.slots]
@@ -0,0 +1,261 @@
+from . import protocol_types as types
+from . import protocol_resolution
+import hashlib
+import struct
+
+
+def _digest(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class LayoutHasher(object):
+    """Computes canonical 64-bit hashes of wire layout of structures and modules.
+
+    Formatting of values, comments and Line() spacers do not contribute to hash.
+    References are hashed by what they point to, so renaming an alias keeps layout hash.
+    Results are memoized, so hashing whole protocol is linear in its size.
+    Wire endianness of module, or protocol_endianness for modules without one, is hashed with module and its structures.
+    """
+
+    def __init__(self, symbols, protocol_endianness=None):
+        self.symbols = symbols
+        self.protocol_endianness = protocol_endianness
+        self.hashes = {}
+
+    def wire_endianness(self, module):
+        if module.wire_endianness is not None:
+            return module.wire_endianness
+        return self.protocol_endianness
+
+    def canonical(self, element, module_name=None):
+        if module_name is None:
+            module_name = self.symbols.owners[id(element)]
+        return element.visit(self, module_name)
+
+    def hash(self, element):
+        key = id(element)
+        if key not in self.hashes:
+            self.hashes[key] = _digest(self.canonical(element))
+        return self.hashes[key]
+
+    def visit_unknown(self, element, module_name):
+        return None
+
+    def visit_partbyte(self, type, module_name):
+        return "partbyte"
+
+    def visit_uint8(self, type, module_name):
+        return "uint8"
+
+    def visit_int8(self, type, module_name):
+        return "int8"
+
+    def visit_uint16(self, type, module_name):
+        return "uint16"
+
+    def visit_int16(self, type, module_name):
+        return "int16"
+
+    def visit_uint32(self, type, module_name):
+        return "uint32"
+
+    def visit_int32(self, type, module_name):
+        return "int32"
+
+    def visit_array(self, type, module_name):
+        return "array({},{})".format(type.internal_type.visit(self, module_name), type.size)
+
+    def visit_pointer(self, type, module_name):
+        return "pointer({})".format(type.internal_type.visit(self, module_name))
+
+    def visit_reference(self, type, module_name):
+        referred = self.symbols.resolve(type, module_name)
+        if isinstance(referred, types.Structure):
+            return "structure({:016x})".format(self.hash(referred))
+        return self.canonical(referred)
+
+    def visit_type_alias(self, type, module_name):
+        return type.type.visit(self, module_name)
+
+    def value(self, value, module_name):
+        # Fixed values may be references to constants, hashed by what they point to like types
+        return value.visit(self, module_name) if hasattr(value, "visit") else str(value)
+
+    def visit_field(self, field, module_name):
+        return "{}:{}={}".format(field.name, field.type.visit(self, module_name), self.value(field.value, module_name))
+
+    def visit_packed_attribute(self, attribute, module_name):
+        return "packed"
+
+    def visit_structure(self, type, module_name):
+        canonical = "structure[{}]{{{}}}".format(
+            ",".join([x for x in [y.visit(self, module_name) for y in type.attributes] if x is not None]),
+            ";".join([x.visit(self, module_name) for x in type.values()])
+        )
+        wire_endianness = self.wire_endianness(self.symbols.modules[module_name])
+        if wire_endianness is not None:
+            return "{}:{}".format(wire_endianness, canonical)
+        return canonical
+
+    def visit_constant(self, type, module_name):
+        return "constant({},{})".format(type.type.visit(self, module_name), type.value)
+
+    def visit_enum(self, type, module_name):
+        return "enum({},{{{}}})".format(
+            type.type.visit(self, module_name),
+            ";".join(["{}={}".format(name, value) for name, value in type.items()])
+        )
+
+    def visit_layer(self, layer, module_name):
+        canonical = "{}:{}".format(layer.name, layer.type.visit(self, module_name))
+        if layer.field is not None:
+            canonical += "[{}={}]".format(layer.field, self.value(layer.value, module_name))
+        return canonical
+
+    def visit_encapsulation(self, type, module_name):
+        return "encapsulation({})".format(";".join([x.visit(self, module_name) for x in type.layers]))
+
+    def visit_module(self, module, module_name):
+        entries = []
+        for name, element in sorted(module.items()):
+            if name.startswith("__internal__"):
+                continue
+            canonical = element.visit(self, module.name)
+            if canonical is not None:
+                entries.append("{}={}".format(name, canonical))
+        wire_endianness = self.wire_endianness(module)
+        if wire_endianness is not None:
+            return "module[{}]{{{}}}".format(wire_endianness, ";".join(entries))
+        return "module{{{}}}".format(";".join(entries))
+
+
+class LayoutSizer(object):
+    """Computes encoded size of types in bytes."""
+
+    def __init__(self, hasher):
+        self.hasher = hasher
+        self.sizes = {}
+
+    def size(self, type, module_name):
+        return type.visit(self, module_name)
+
+    def visit_partbyte(self, type, module_name):
+        return 1
+
+    def visit_uint8(self, type, module_name):
+        return 1
+
+    def visit_int8(self, type, module_name):
+        return 1
+
+    def visit_uint16(self, type, module_name):
+        return 2
+
+    def visit_int16(self, type, module_name):
+        return 2
+
+    def visit_uint32(self, type, module_name):
+        return 4
+
+    def visit_int32(self, type, module_name):
+        return 4
+
+    def visit_array(self, type, module_name):
+        return type.internal_type.visit(self, module_name) * type.size
+
+    def visit_pointer(self, type, module_name):
+        # Pointers are sent as they are in memory of machine running generator
+        return struct.calcsize("P")
+
+    def visit_reference(self, type, module_name):
+        referred = self.hasher.symbols.resolve(type, module_name)
+        key = id(referred)
+        if key not in self.sizes:
+            self.sizes[key] = referred.visit(self, self.hasher.symbols.owners[key])
+        return self.sizes[key]
+
+    def visit_type_alias(self, type, module_name):
+        return type.type.visit(self, module_name)
+
+    def visit_structure(self, type, module_name):
+        return sum([x.type.visit(self, module_name) for x in type.values()])
+
+
+def _layout(structure, module_name, hasher, sizer):
+    fields = {}
+    offset = 0
+    for field in structure.values():
+        size = sizer.size(field.type, module_name)
+        value = hasher.value(field.value, module_name) if field.value is not None else None
+        fields[field.name] = (offset, size, hasher.canonical(field.type, module_name), value)
+        offset += size
+    return fields
+
+
+def diff_modules(old, new, old_protocol_endianness=None, new_protocol_endianness=None):
+    """Lists differences in wire layout between two versions of a module, as human readable lines."""
+    old_hasher = LayoutHasher(protocol_resolution.SymbolTable([old]), old_protocol_endianness)
+    new_hasher = LayoutHasher(protocol_resolution.SymbolTable([new]), new_protocol_endianness)
+    if old_hasher.hash(old) == new_hasher.hash(new):
+        return []
+
+    old_sizer = LayoutSizer(old_hasher)
+    new_sizer = LayoutSizer(new_hasher)
+
+    def named(module):
+        return dict([(k, v) for k, v in module.items() if not k.startswith("__internal__")])
+
+    old_elements = named(old)
+    new_elements = named(new)
+    changes = []
+    endianness_changed = old_hasher.wire_endianness(old) != new_hasher.wire_endianness(new)
+    if endianness_changed:
+        changes.append("{}: wire endianness changed from {} to {}".format(
+            new.name, old_hasher.wire_endianness(old), new_hasher.wire_endianness(new)))
+    for name in old_elements:
+        if name not in new_elements and old_elements[name].visit(old_hasher, old.name) is not None:
+            changes.append("{}.{}: removed".format(old.name, name))
+    for name, element in new_elements.items():
+        if element.visit(new_hasher, new.name) is None:
+            continue
+        if name not in old_elements:
+            changes.append("{}.{}: added".format(new.name, name))
+            continue
+        previous = old_elements[name]
+        if old_hasher.canonical(previous, old.name) == new_hasher.canonical(element, new.name):
+            continue
+        if isinstance(element, types.Constant) and isinstance(previous, types.Constant):
+            changes.append("{}.{}: {} changed to {}".format(
+                new.name, name, old_hasher.canonical(previous, old.name), new_hasher.canonical(element, new.name)))
+        elif isinstance(element, types.Structure) and isinstance(previous, types.Structure):
+            field_changes = _diff_structures(
+                "{}.{}".format(new.name, name),
+                _layout(previous, old.name, old_hasher, old_sizer),
+                _layout(element, new.name, new_hasher, new_sizer))
+            if len(field_changes) == 0 and not endianness_changed:
+                field_changes.append("{}.{}: field order or attributes changed".format(new.name, name))
+            changes += field_changes
+        else:
+            changes.append("{}.{}: definition changed".format(new.name, name))
+    return changes
+
+
+def _diff_structures(prefix, old_fields, new_fields):
+    changes = []
+    for name in old_fields:
+        if name not in new_fields:
+            changes.append("{}.{}: field removed".format(prefix, name))
+    for name, (offset, size, canonical, value) in new_fields.items():
+        if name not in old_fields:
+            changes.append("{}.{}: field added at offset {}".format(prefix, name, offset))
+            continue
+        old_offset, old_size, old_canonical, old_value = old_fields[name]
+        if old_offset != offset:
+            changes.append("{}.{}: moved from offset {} to {}".format(prefix, name, old_offset, offset))
+        if old_size != size:
+            changes.append("{}.{}: resized from {} to {} bytes".format(prefix, name, old_size, size))
+        elif old_canonical != canonical:
+            changes.append("{}.{}: type changed from {} to {}".format(prefix, name, old_canonical, canonical))
+        if old_value != value:
+            changes.append("{}.{}: fixed value changed from {} to {}".format(prefix, name, old_value, value))
+    return changes
@@ -1,10 +1,69 @@
 from . import protocol_types as types
+from . import protocol_hash
+from . import protocol_resolution
 import os.path
 
 
 class ProtocolPrinter(object):
+    # Types of fields that may select next layer of encapsulation
+    selector_types = (types.partbyte, types.uint8, types.int8, types.uint16, types.int16, types.uint32, types.int32)
+
     def __init__(self, protocol):
         self.protocol = protocol
+        self.symbols = protocol_resolution.SymbolTable(protocol.modules)
+        self.layout_hasher = protocol_hash.LayoutHasher(self.symbols, protocol.wire_endianness)
+        self._check_wire_endianness()
+        self._check_encapsulations()
+
+    def wire_endianness(self, module):
+        """Byte order module is generated for, None if it has coders for both native and big endian."""
+        if module.wire_endianness is not None:
+            return module.wire_endianness
+        return self.protocol.wire_endianness
+
+    def _check_wire_endianness(self):
+        # Coders of nested structures are called in byte order of outer one, so it must be the same
+        def nested_modules(type, module_name):
+            if isinstance(type, types.Array):
+                return nested_modules(type.internal_type, module_name)
+            if isinstance(type, types.Reference):
+                referred = self.symbols.resolve(type, module_name)
+                referred_module = self.symbols.owners[id(referred)]
+                if isinstance(referred, types.Structure):
+                    return [referred_module]
+                if isinstance(referred, types.TypeAlias):
+                    return nested_modules(referred.type, referred_module)
+            return []
+
+        for module in self.symbols.modules.values():
+            for structure in [x for x in module.values() if isinstance(x, types.Structure)]:
+                for field in structure.values():
+                    for nested in nested_modules(field.type, module.name):
+                        if self.wire_endianness(self.symbols.modules[nested]) != self.wire_endianness(module):
+                            raise ValueError("{}.{}.{}: nested structure from module {} has different wire endianness".format(
+                                module.name, structure.name, field.name, nested))
+
+    def _check_encapsulations(self):
+        # Fused parsers read all layers in byte order of module with encapsulation
+        for module in self.symbols.modules.values():
+            for encapsulation in [x for x in module.values() if isinstance(x, types.Encapsulation)]:
+                previous = None
+                for layer in encapsulation.layers:
+                    structure = self.symbols.resolve(layer.type, module.name)
+                    owner = self.symbols.modules[self.symbols.owners[id(structure)]]
+                    if not isinstance(structure, types.Structure):
+                        raise ValueError("{}.{}.{}: layer is not a structure".format(
+                            module.name, encapsulation.name, layer.name))
+                    if self.wire_endianness(owner) != self.wire_endianness(module):
+                        raise ValueError("{}.{}.{}: layer from module {} has different wire endianness".format(
+                            module.name, encapsulation.name, layer.name, owner.name))
+                    if layer.field is not None and layer.field not in previous:
+                        raise ValueError("{}.{}.{}: preceding layer has no field {}".format(
+                            module.name, encapsulation.name, layer.name, layer.field))
+                    if layer.field is not None and not isinstance(previous[layer.field].type, self.selector_types):
+                        raise ValueError("{}.{}.{}: selector field {} is not a plain scalar".format(
+                            module.name, encapsulation.name, layer.name, layer.field))
+                    previous = structure
 
     def _get_module_content(self, module, imports):
         raise NotImplementedError()
@@ -16,17 +75,47 @@ class ProtocolPrinter(object):
         content = self._get_module_content(module)
         print(content)
 
+    def _get_module_extra_files(self, module):
+        """(file name, content) of files printed for module besides its main file."""
+        return []
+
+    def _get_protocol_extra_files(self):
+        """(file name, content) of files printed once for whole protocol."""
+        return []
+
     def _print_module_to_file(self, module, output_dir):
         file_path = os.path.join(output_dir, self._get_module_file_format().format(module.name))
 
         content = self._get_module_content(module)
         file = open(file_path, "w")
         file.write(content)
+        for file_name, content in self._get_module_extra_files(module):
+            with open(os.path.join(output_dir, file_name), "w") as file:
+                file.write(content)
+
+    def modules(self):
+        """Protocol modules, each after modules it imports."""
+        return self.symbols.ordered(self.protocol.modules)
+
+    def module_contents(self):
+        """(module, file name, content) of every printed module."""
+        return [(x, self._get_module_file_format().format(x.name), self._get_module_content(x)) for x in self.modules()]
+
+    def extra_contents(self):
+        """(module, file name, content) of every printed file besides module files, module is None for protocol files."""
+        contents = []
+        for module in self.modules():
+            contents += [(module, file_name, content) for file_name, content in self._get_module_extra_files(module)]
+        contents += [(None, file_name, content) for file_name, content in self._get_protocol_extra_files()]
+        return contents
 
     def print_to_stdout(self):
-        for module in self.protocol.modules:
+        for module in self.modules():
             self._print_module_to_stdout(module)
 
     def print_to_file(self, output_dir):
-        for module in self.protocol.modules:
+        for module in self.modules():
             self._print_module_to_file(module, output_dir)
+        for file_name, content in self._get_protocol_extra_files():
+            with open(os.path.join(output_dir, file_name), "w") as file:
+                file.write(content)
@@ -0,0 +1,583 @@
+from . import protocol_types as types
+from . import protocol_printer as printer
+from . import protocol_enum
+from . import protocol_hash
+
+import sys
+
+
+def tab(tabs=1):
+    return " " * 4 * tabs
+
+
+class PythonValuePrinter(object):
+    def visit_unknown(self, type, value):
+        raise NotImplementedError()
+
+    def visit_partbyte(self, type, value):
+        if type.format == "hex":
+            return "0x{:02x}".format(value)
+        return "{}".format(value)
+
+    def visit_uint8(self, type, value):
+        if type.format == "hex":
+            return "0x{:02x}".format(value)
+        return "{}".format(value)
+
+    def visit_int8(self, type, value):
+        return "{}".format(value)
+
+    def visit_uint16(self, type, value):
+        if type.format == "hex":
+            return "0x{:04x}".format(value)
+        return "{}".format(value)
+
+    def visit_int16(self, type, value):
+        return "{}".format(value)
+
+    def visit_uint32(self, type, value):
+        if type.format == "hex":
+            return "0x{:08x}".format(value)
+        return "{}".format(value)
+
+    def visit_int32(self, type, value):
+        return "{}".format(value)
+
+    def visit_array(self, type, value):
+        if type.internal_type.visit(PythonFieldLayout.ScalarFormat()) == "B":
+            return "bytes([" + ", ".join([type.internal_type.visit(self, x) for x in value]) + "])"
+        return "(" + "".join([type.internal_type.visit(self, x) + ", " for x in value]) + ")"
+
+
+class PythonNestedArray(object):
+    """Codes arrays of structures and arrays of arrays element by element.
+
+    Innermost arrays of integers are coded by struct.Struct of field, named by element_struct().
+    """
+
+    def __init__(self, type_printer, name, type):
+        self.type_printer = type_printer
+        self.name = name
+        # (count, element size) of every array dimension, outermost first
+        self.dimensions = []
+        self.structure = None
+        self.leaf = None
+        sizer = protocol_hash.LayoutSizer(type_printer.layout_hasher)
+        while True:
+            element = type_printer.resolve_alias(type.internal_type)
+            self.dimensions.append((type.size, sizer.size(element, type_printer.current_module)))
+            if isinstance(element, types.Reference):
+                self.structure = element.visit(type_printer)
+                break
+            if not isinstance(element, types.Array):
+                raise NotImplementedError("Arrays of {} are not supported in Python".format(type.internal_type))
+            if type_printer.resolve_alias(element.internal_type).visit(PythonFieldLayout.ScalarFormat()) is not None:
+                self.leaf = PythonFieldLayout(type_printer, types.Field(name, element))
+                break
+            type = element
+
+    def element_struct(self, suffix):
+        return "_element_{}{}".format(self.name, suffix)
+
+    def default(self, depth=0):
+        count, _ = self.dimensions[depth]
+        if depth + 1 < len(self.dimensions):
+            element = self.default(depth + 1)
+        elif self.structure is not None:
+            element = "{}()".format(self.structure)
+        else:
+            element = self.leaf.default
+        return "tuple([{} for _ in range({})])".format(element, count)
+
+    def decode(self, suffix, byte_order, offset, depth=0):
+        count, size = self.dimensions[depth]
+        index = "_i{}".format(depth)
+        element_offset = "{} + {} * {}".format(offset, size, index)
+        if depth + 1 < len(self.dimensions):
+            element = self.decode(suffix, byte_order, element_offset, depth + 1)
+        elif self.structure is not None:
+            element = "{}.decode{}(buffer, {})".format(self.structure, suffix, element_offset)
+        elif self.leaf.is_array:
+            element = "cls.{}.unpack_from(buffer, {})".format(self.element_struct(suffix), element_offset)
+        else:
+            element = "cls.{}.unpack_from(buffer, {})[0]{}".format(
+                self.element_struct(suffix), element_offset, "[::-1]" if self.leaf.reversed_be and byte_order == ">" else "")
+        return "tuple([{} for {} in range({})])".format(element, index, count)
+
+    def encode(self, owner, suffix, byte_order, value, buffer, offset, tabs, depth=0):
+        _, size = self.dimensions[depth]
+        index = "_i{}".format(depth)
+        item = "_x{}".format(depth)
+        element_offset = "{} + {} * {}".format(offset, size, index)
+        definition = tab(tabs) + "for {}, {} in enumerate({}):\n".format(index, item, value)
+        if depth + 1 < len(self.dimensions):
+            definition += self.encode(owner, suffix, byte_order, item, buffer, element_offset, tabs + 1, depth + 1)
+        elif self.structure is not None:
+            definition += tab(tabs + 1) + "{}.encode{}({}, {})\n".format(item, suffix, buffer, element_offset)
+        else:
+            if self.leaf.is_array:
+                item = "*" + item
+            elif self.leaf.reversed_be and byte_order == ">":
+                item += "[::-1]"
+            definition += tab(tabs + 1) + "{}.{}.pack_into({}, {}, {})\n".format(
+                owner, self.element_struct(suffix), buffer, element_offset, item)
+        return definition
+
+
+class PythonFieldLayout(object):
+    """Describes how field is stored in struct.Struct of its structure.
+
+    Scalars and arrays of bytes are single struct items, other arrays of integers are several items.
+    Nested structures are skipped as padding and coded by their own class,
+    arrays of structures and of arrays are skipped too and coded by PythonNestedArray.
+    """
+
+    class ScalarFormat(object):
+        def visit_unknown(self, type):
+            return None
+
+        def visit_partbyte(self, type):
+            return "B"
+
+        def visit_uint8(self, type):
+            return "B"
+
+        def visit_int8(self, type):
+            return "b"
+
+        def visit_uint16(self, type):
+            return "H"
+
+        def visit_int16(self, type):
+            return "h"
+
+        def visit_uint32(self, type):
+            return "I"
+
+        def visit_int32(self, type):
+            return "i"
+
+    def __init__(self, type_printer, field):
+        self.type_printer = type_printer
+        self.name = field.name
+        self.format = ""
+        self.count = 0
+        self.size = 0
+        self.default = "0"
+        self.structure = None
+        self.nested_array = None
+        self.is_array = False
+        self.reversed_be = False
+        field.type.visit(self)
+
+    def visit_unknown(self, type):
+        raise NotImplementedError()
+
+    def scalar(self, type):
+        self.format = type.visit(PythonFieldLayout.ScalarFormat())
+        self.count = 1
+        self.size = type.visit(protocol_hash.LayoutSizer(self.type_printer.layout_hasher), self.type_printer.current_module)
+
+    visit_partbyte = scalar
+    visit_uint8 = scalar
+    visit_int8 = scalar
+    visit_uint16 = scalar
+    visit_int16 = scalar
+    visit_uint32 = scalar
+    visit_int32 = scalar
+
+    def visit_array(self, type):
+        internal = self.type_printer.resolve_alias(type.internal_type)
+        internal_format = internal.visit(PythonFieldLayout.ScalarFormat())
+        if internal_format is None:
+            self.nested_array = PythonNestedArray(self.type_printer, self.name, type)
+            self.format = "{}x".format(type.visit(protocol_hash.LayoutSizer(self.type_printer.layout_hasher),
+                                                   self.type_printer.current_module))
+            self.default = "None"
+        elif internal_format == "B":
+            # Arrays of partbyte are treated as big integer that needs reverse byte order in big endian
+            self.format = "{}s".format(type.size)
+            self.count = 1
+            self.reversed_be = isinstance(internal, types.partbyte)
+            self.default = "bytes({})".format(type.size)
+        else:
+            self.format = "{}{}".format(type.size, internal_format)
+            self.count = type.size
+            self.is_array = True
+            self.default = "(0,) * {}".format(type.size)
+        self.size = type.visit(protocol_hash.LayoutSizer(self.type_printer.layout_hasher), self.type_printer.current_module)
+
+    def visit_reference(self, type):
+        referred = self.type_printer.layout_hasher.symbols.resolve(type, self.type_printer.current_module)
+        if isinstance(referred, types.Structure):
+            self.size = type.visit(protocol_hash.LayoutSizer(self.type_printer.layout_hasher), self.type_printer.current_module)
+            self.format = "{}x".format(self.size)
+            self.structure = type.visit(self.type_printer)
+            self.default = "None"
+        else:
+            referred.type.visit(self)
+
+
+class PythonTypePrinter(object):
+    def __init__(self, module="", layout_hasher=None, wire_endianness=None):
+        self.current_module = module
+        self.layout_hasher = layout_hasher
+        self.wire_endianness = wire_endianness
+
+    def coder_variants(self):
+        # (suffix of generated methods, struct attribute, byte order)
+        if self.wire_endianness == types.BigEndian:
+            return [("", "_struct", ">")]
+        if self.wire_endianness == types.LittleEndian:
+            return [("", "_struct", "<")]
+        return [("", "_struct", "="), ("_be", "_struct_be", ">")]
+
+    def visit_unknown(self):
+        raise NotImplementedError()
+
+    def resolve_alias(self, type):
+        while isinstance(type, types.Reference):
+            referred = self.layout_hasher.symbols.resolve(type, self.current_module)
+            if not isinstance(referred, types.TypeAlias):
+                break
+            type = referred.type
+        return type
+
+    def fixed_value(self, field):
+        # References to constants are printed as value, so constant may be defined after structure
+        value = field.value
+        if isinstance(value, types.Reference):
+            value = self.layout_hasher.symbols.resolve(value, self.current_module).value
+        return self.resolve_alias(field.type).visit(PythonValuePrinter(), value)
+
+    def visit_line(self, line):
+        return "{}".format(line.text)
+
+    def visit_reference(self, type):
+        if type.referred_module is not None and type.referred_module != self.current_module:
+            return "{}.{}".format(
+                type.referred_module,
+                type.referred_name
+            )
+        else:
+            return type.referred_name
+
+    def visit_type_alias(self, type):
+        # Aliases have no representation in Python, fields are coded by resolved type
+        return "# {} is alias of {}".format(type.name, self.layout_hasher.canonical(type, self.current_module))
+
+    def visit_constant(self, type):
+        return "{} = {}".format(type.name, type.type.visit(PythonValuePrinter(), type.value))
+
+    def visit_enum(self, type):
+        table = protocol_enum.EnumTable(type)
+        members = "_{}_members".format(type.name)
+
+        definition  = "\n"
+        definition += "class {}(enum.IntEnum):\n".format(type.name)
+        definition += "".join(["{}{} = {}\n".format(tab(), name, type.type.visit(PythonValuePrinter(), value))
+                               for name, value in type.items()])
+        definition += "\n"
+        definition += tab() + "@classmethod\n"
+        definition += tab() + "def from_value(cls, value):\n"
+        definition += tab(2) + "\"\"\"Returns member with given value or None if value is not in enum.\"\"\"\n"
+        if table.is_dense:
+            definition += tab(2) + "offset = value - {}\n".format(table.base)
+            definition += tab(2) + "return {}[offset] if 0 <= offset < {} else None\n".format(members, len(table.slots))
+        else:
+            definition += tab(2) + "return {}.get(value)\n".format(members)
+        definition += "\n"
+        definition += "\n"
+
+        # Sparse enums use dict, which is already hash table with cheaper lookup than modulus in Python
+        if table.is_dense:
+            definition += "{} = ({})\n".format(members, "".join(
+                ["{}.{}, ".format(type.name, x) if x is not None else "None, " for x in table.names()]))
+        else:
+            definition += "{} = {{{}}}\n".format(members, ", ".join(
+                ["{0}.{1}: {0}.{1}".format(type.name, x) for x in table.names() if x is not None]))
+        return definition
+
+    def get_decoder(self, type, layouts, suffix, struct_name, byte_order):
+        definition  = tab() + "@classmethod\n"
+        definition += tab() + "def decode{}(cls, buffer, offset=0):\n".format(suffix)
+        if any([x.count > 0 for x in layouts]):
+            definition += tab(2) + "values = cls.{}.unpack_from(buffer, offset)\n".format(struct_name)
+        arguments = []
+        index = 0
+        offset = 0
+        for layout in layouts:
+            if layout.structure is not None:
+                arguments.append("{}.decode{}(buffer, offset + {})".format(layout.structure, suffix, offset))
+            elif layout.nested_array is not None:
+                arguments.append(layout.nested_array.decode(suffix, byte_order, "offset + {}".format(offset)))
+            elif not layout.is_array:
+                reverse = "[::-1]" if layout.reversed_be and byte_order == ">" else ""
+                arguments.append("values[{}]{}".format(index, reverse))
+            else:
+                arguments.append("values[{}:{}]".format(index, index + layout.count))
+            index += layout.count
+            offset += layout.size
+        definition += tab(2) + "return cls({})\n".format(", ".join(arguments))
+        return definition
+
+    def get_encoder(self, type, layouts, suffix, struct_name, byte_order):
+        arguments = []
+        nested = []
+        offset = 0
+        for layout in layouts:
+            if layout.structure is not None:
+                nested.append(tab(2) + "self.{}.encode{}(buffer, offset + {})\n".format(layout.name, suffix, offset))
+            elif layout.nested_array is not None:
+                nested.append(layout.nested_array.encode("self", suffix, byte_order,
+                                                         "self." + layout.name, "buffer", "offset + {}".format(offset), 2))
+            elif not layout.is_array:
+                reverse = "[::-1]" if layout.reversed_be and byte_order == ">" else ""
+                arguments.append("self.{}{}".format(layout.name, reverse))
+            else:
+                arguments.append("*self.{}".format(layout.name))
+            offset += layout.size
+
+        definition  = tab() + "def encode{}(self, buffer, offset=0):\n".format(suffix)
+        definition += tab(2) + "self.{}.pack_into(buffer, offset{})\n".format(
+            struct_name, "".join([", " + x for x in arguments]))
+        definition += "".join(nested)
+        definition += tab(2) + "return offset + {}\n".format(offset)
+        return definition
+
+    numpy_formats = {"B": "u1", "b": "i1", "H": "u2", "h": "i2", "I": "u4", "i": "i4", "s": "u1"}
+
+    def get_builder(self, type, layouts, suffix, byte_order):
+        # Builders copy prepared template and write only fields that differ, single or NumPy columns at once.
+        # Own parameters are positional only and renamed away from field names, which are keyword arguments.
+        field_names = set([x.name for x in layouts])
+
+        def parameter(name):
+            name = "_" + name
+            while name in field_names:
+                name = "_" + name
+            return name
+
+        cls, template, buffer, offset, count, stride = [
+            parameter(x) for x in ("cls", "template", "buffer", "offset", "count", "stride")]
+        size = sum([x.size for x in layouts])
+        field_structs = []
+        writes = []
+        dtype_names = []
+        dtype_formats = []
+        dtype_offsets = []
+        field_offset = 0
+        for layout in layouts:
+            writes.append(tab(2) + "if {} is not None:\n".format(layout.name))
+            if layout.structure is not None:
+                writes.append(tab(3) + "{}.encode{}({}, {} + {})\n".format(layout.name, suffix, buffer, offset, field_offset))
+            elif layout.nested_array is not None:
+                writes.append(layout.nested_array.encode(cls, suffix, byte_order, layout.name, buffer,
+                                                         "{} + {}".format(offset, field_offset), 3))
+            else:
+                field_struct = "_struct_{}{}".format(layout.name, suffix)
+                field_structs.append(tab() + "{} = struct.Struct(\"{}{}\")\n".format(field_struct, byte_order, layout.format))
+                if layout.is_array:
+                    value = "*" + layout.name
+                elif layout.reversed_be and byte_order == ">":
+                    value = layout.name + "[::-1]"
+                else:
+                    value = layout.name
+                writes.append(tab(3) + "{}.{}.pack_into({}, {} + {}, {})\n".format(
+                    cls, field_struct, buffer, offset, field_offset, value))
+
+                item = self.numpy_formats[layout.format[-1]]
+                numpy_format = "\"{}{}\"".format(byte_order if not item.endswith("1") else "|", item)
+                if layout.is_array:
+                    numpy_format = "({}, {})".format(numpy_format, layout.count)
+                elif layout.format.endswith("s"):
+                    numpy_format = "({}, {})".format(numpy_format, layout.size)
+                dtype_names.append("\"{}\"".format(layout.name))
+                dtype_formats.append(numpy_format)
+                dtype_offsets.append(str(field_offset))
+            field_offset += layout.size
+        reversed_names = [x.name for x in layouts if x.reversed_be and byte_order == ">"]
+
+        definition  = "".join(field_structs)
+        definition += tab() + "_dtype{} = None\n".format(suffix)
+        definition += "\n"
+
+        definition += tab() + "@classmethod\n"
+        definition += tab() + "def template{}(_cls, /, **values):\n".format(suffix)
+        definition += tab(2) + "\"\"\"Encoded structure with fixed and given values, other fields are zero.\"\"\"\n"
+        definition += tab(2) + "buffer = bytearray({})\n".format(size)
+        definition += tab(2) + "_cls(**values).encode{}(buffer)\n".format(suffix)
+        definition += tab(2) + "return bytes(buffer)\n"
+        definition += "\n"
+
+        definition += tab() + "@classmethod\n"
+        definition += tab() + "def build{}({}, {}, {}, {}=0, /{}):\n".format(
+            suffix, cls, template, buffer, offset, "".join([", {}=None".format(x.name) for x in layouts]))
+        definition += tab(2) + "\"\"\"Copies template to buffer at offset and writes given field values over it.\"\"\"\n"
+        # Slice assignment of other length would resize bytearray instead of failing
+        definition += tab(2) + "if len({}) != {}:\n".format(template, size)
+        definition += tab(3) + "raise ValueError(\"Template has {{}} bytes, {} expected\".format(len({})))\n".format(size, template)
+        definition += tab(2) + "{0}[{1}:{1} + {2}] = {3}\n".format(buffer, offset, size, template)
+        definition += "".join(writes)
+        definition += tab(2) + "return {} + {}\n".format(offset, size)
+        definition += "\n"
+
+        definition += tab() + "@classmethod\n"
+        definition += tab() + "def dtype{}(cls):\n".format(suffix)
+        definition += tab(2) + "\"\"\"NumPy structured dtype of encoded structure, without nested structures and nested arrays.\"\"\"\n"
+        definition += tab(2) + "if cls._dtype{} is None:\n".format(suffix)
+        definition += tab(3) + "cls._dtype{} = _numpy().dtype({{\"names\": [{}], \"formats\": [{}], \"offsets\": [{}], \"itemsize\": {}}})\n".format(
+            suffix, ", ".join(dtype_names), ", ".join(dtype_formats), ", ".join(dtype_offsets), size)
+        definition += tab(2) + "return cls._dtype{}\n".format(suffix)
+        definition += "\n"
+
+        # Columns are keyword arguments too, so parameters are renamed the same way as in build
+        definition += tab() + "@classmethod\n"
+        definition += tab() + "def build_array{}({}, {}, {}, {}, {}=0, {}={}, /, **columns):\n".format(
+            suffix, cls, template, buffer, count, offset, stride, size)
+        definition += tab(2) + "\"\"\"Builds count structures stride bytes apart, columns are NumPy arrays with value of field for each.\"\"\"\n"
+        definition += tab(2) + "numpy = _numpy()\n"
+        definition += tab(2) + "raw = numpy.ndarray(({}, {}), numpy.uint8, {}, {}, ({}, 1))\n".format(count, size, buffer, offset, stride)
+        definition += tab(2) + "raw[:] = numpy.frombuffer({}, numpy.uint8)\n".format(template)
+        definition += tab(2) + "records = numpy.ndarray(({},), {}.dtype{}(), {}, {}, ({},))\n".format(
+            count, cls, suffix, buffer, offset, stride)
+        definition += tab(2) + "for name, column in columns.items():\n"
+        if len(reversed_names) > 0:
+            definition += tab(3) + "if name in ({}):\n".format("".join(["\"{}\", ".format(x) for x in reversed_names]))
+            definition += tab(4) + "column = numpy.asarray(column)[..., ::-1]\n"
+        definition += tab(3) + "records[name] = column\n"
+        definition += tab(2) + "return {} + {} * {}\n".format(offset, count, stride)
+        return definition
+
+    def class_members(self):
+        members = ["wireSize", "wireEndianness", "layoutHash"]
+        for suffix, _, _ in self.coder_variants():
+            members += [x + suffix for x in ("decode", "encode", "template", "build", "dtype", "build_array")]
+        return members
+
+    def visit_structure(self, type):
+        taken = [x for x in type.keys() if x in self.class_members()]
+        if len(taken) > 0:
+            raise ValueError("{}.{}: field names {} are taken by members of generated Python class".format(
+                self.current_module, type.name, ", ".join(taken)))
+        layouts = [PythonFieldLayout(self, x) for x in type.values()]
+        struct_format = "".join([x.format for x in layouts])
+
+        definition  = "class {}(object):\n".format(type.name)
+        definition += tab() + "__slots__ = ({})\n".format("".join(['"{}", '.format(x.name) for x in layouts]))
+        definition += "\n"
+        definition += tab() + "wireSize = {}\n".format(sum([x.size for x in layouts]))
+        if self.wire_endianness is not None:
+            definition += tab() + "wireEndianness = \"{}\"\n".format(self.wire_endianness)
+        if self.layout_hasher is not None:
+            definition += tab() + "layoutHash = 0x{:016x}\n".format(self.layout_hasher.hash(type))
+        for suffix, struct_name, byte_order in self.coder_variants():
+            definition += tab() + "{} = struct.Struct(\"{}{}\")\n".format(struct_name, byte_order, struct_format)
+            for nested_array in [x.nested_array for x in layouts if x.nested_array is not None and x.nested_array.leaf is not None]:
+                definition += tab() + "{} = struct.Struct(\"{}{}\")\n".format(
+                    nested_array.element_struct(suffix), byte_order, nested_array.leaf.format)
+        definition += "\n"
+
+        # ctor: all fields are optional, fields with fixed value default to it
+        def argument(field, layout):
+            if field.value is not None:
+                return "{}={}".format(field.name, self.fixed_value(field))
+            return "{}={}".format(field.name, layout.default)
+
+        definition += tab() + "def __init__(self{}):\n".format(
+            "".join([", " + argument(x, y) for x, y in zip(type.values(), layouts)]))
+        for layout in layouts:
+            if layout.structure is not None:
+                definition += tab(2) + "self.{0} = {1}() if {0} is None else {0}\n".format(layout.name, layout.structure)
+            elif layout.nested_array is not None:
+                definition += tab(2) + "self.{0} = {1} if {0} is None else {0}\n".format(layout.name, layout.nested_array.default())
+            else:
+                definition += tab(2) + "self.{0} = {0}\n".format(layout.name)
+        if len(layouts) == 0:
+            definition += tab(2) + "pass\n"
+        definition += "\n"
+
+        definition += tab() + "def __eq__(self, other):\n"
+        definition += tab(2) + "return type(self) is type(other) and all(\n"
+        definition += tab(3) + "getattr(self, x) == getattr(other, x) for x in self.__slots__)\n"
+        definition += "\n"
+        definition += tab() + "def __repr__(self):\n"
+        definition += tab(2) + "return \"{}({{}})\".format(\", \".join(\n".format(type.name)
+        definition += tab(3) + "[\"{}={!r}\".format(x, getattr(self, x)) for x in self.__slots__]))\n"
+        definition += "\n"
+
+        coders = []
+        for suffix, struct_name, byte_order in self.coder_variants():
+            coders.append(self.get_decoder(type, layouts, suffix, struct_name, byte_order))
+        for suffix, struct_name, byte_order in self.coder_variants():
+            coders.append(self.get_encoder(type, layouts, suffix, struct_name, byte_order))
+        for suffix, struct_name, byte_order in self.coder_variants():
+            coders.append(self.get_builder(type, layouts, suffix, byte_order))
+        definition += "\n".join(coders)
+        return definition
+
+    def visit_encapsulation(self, type):
+        # Fused parsers are generated only for C and C++
+        return ""
+
+    def visit_line_comment(self, comment):
+        return "# {}".format(comment.text)
+
+    def visit_block_comment(self, comment):
+        return "# {}".format(comment.text)
+
+    def visit_module(self, module):
+        content = ""
+        if self.layout_hasher is not None:
+            content += "layoutHash = 0x{:016x}\n".format(self.layout_hasher.hash(module))
+        content += "\n".join([x.visit(PythonTypePrinter(module.name, self.layout_hasher, self.wire_endianness)) for x in module.values()])
+        return content
+
+
+class PythonPrinter(printer.ProtocolPrinter):
+    def __init__(self, protocol):
+        super(PythonPrinter, self).__init__(protocol)
+
+    def _get_module_content(self, module):
+        return self._print_header(module) + module.visit(PythonTypePrinter("", self.layout_hasher, self.wire_endianness(module)))
+
+    def _get_module_file_format(self):
+        return self.protocol.name + "_" + "{}.py"
+
+    def _get_module_import_name(self, module):
+        return self._get_module_file_format().format(module.name)[:-len(".py")]
+
+    def _print_imports(self, imports):
+        return "".join(["import {} as {}\n".format(self._get_module_import_name(x), x.name) for x in imports])
+
+    def _print_header(self, module):
+        header =  "import enum\n"
+        header += "import struct\n"
+        header += self._print_imports(module.imports)
+        header += "\n"
+        header += "\n"
+        # NumPy is needed only by bulk builders, so it is imported on first use
+        header += "def _numpy():\n"
+        header += tab() + "try:\n"
+        header += tab(2) + "import numpy\n"
+        header += tab() + "except ImportError:\n"
+        header += tab(2) + "raise ImportError(\"NumPy is required by build_array and dtype methods, install numpy package\")\n"
+        header += tab() + "return numpy\n"
+        header += "\n"
+        header += "\n"
+        return header
+
+    def load(self):
+        """Executes generated modules in memory, so they can be used without writing files.
+
+        Modules are registered in sys.modules under the same names as printed files would have.
+        Returns dictionary: module name -> Python module.
+        """
+        loaded = {}
+        for module in self.modules():
+            import_name = self._get_module_import_name(module)
+            python_module = type(sys)(import_name)
+            exec(compile(self._get_module_content(module), "<{}>".format(import_name), "exec"), python_module.__dict__)
+            sys.modules[import_name] = python_module
+            loaded[module.name] = python_module
+        return loaded
@@ -0,0 +1,133 @@
+from . import protocol_types as types
+from . import protocol_hash
+from . import protocol_c_printer
+from . import protocol_c_sharp_printer
+from . import protocol_cpp_printer
+from . import protocol_python_printer
+
+import marshal
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+
+# Signature line ending with ")" followed by line with opening brace, as all C family printers format functions;
+# control statements are formatted the same way and are skipped
+_C_FUNCTION = re.compile(r"^(?! *(if|for|while|switch) *\().*\)( const)?\n *\{", re.MULTILINE)
+_PYTHON_FUNCTION = re.compile(r"^ *def ", re.MULTILINE)
+
+# Rough x86-64 -O2 figures: call overhead of out-of-line function and code per byte moved by coder
+FUNCTION_BYTES = 16
+CODED_BYTE_BYTES = 4
+
+
+class ModuleReport(object):
+    """Size figures of one generated module file; None where figure does not apply to backend."""
+
+    def __init__(self, backend, module, file_name, content):
+        self.backend = backend
+        self.module = module
+        self.file_name = file_name
+        self.lines = content.count("\n")
+        self.functions = len((_PYTHON_FUNCTION if backend == "py" else _C_FUNCTION).findall(content))
+        self.instantiations = None
+        self.object_size = None
+        self.compile_time = None
+
+
+class CppCoderCounter(object):
+    """Counts codec::encode_any/decode_any instantiations and bytes moved by C++ coders and views of module.
+
+    With source, only coders defined out of line in source file of module are counted, otherwise those in header.
+    """
+
+    def __init__(self, printer, module, source=False):
+        self.type_printer = protocol_cpp_printer.CppTypePrinter(
+            module.name, None, printer.layout_hasher, printer.wire_endianness(module), printer.out_of_line)
+        self.sizer = protocol_hash.LayoutSizer(printer.layout_hasher)
+        self.instantiations = set()
+        self.coded_bytes = 0
+        for structure in [x for x in module.values() if isinstance(x, types.Structure)]:
+            out_of_line = self.type_printer.is_out_of_line(structure)
+            if source and not out_of_line:
+                continue
+            for _, call_suffix in self.type_printer.coder_variants():
+                for field in structure.values():
+                    field_type = field.type.visit(self.type_printer)
+                    field_size = self.sizer.size(field.type, module.name)
+                    self.instantiations.add(("encode_any" + call_suffix, field_type))
+                    self.instantiations.add(("decode_any" + call_suffix, field_type))
+                    # Getter and setter of view are in header, encode and decode of structure in header or source
+                    self.coded_bytes += (2 if source or out_of_line else 4) * field_size
+
+
+def _backend(printer):
+    if isinstance(printer, protocol_cpp_printer.CppPrinter):
+        return "cpp"
+    if isinstance(printer, protocol_c_printer.CPrinter):
+        return "c"
+    if isinstance(printer, protocol_c_sharp_printer.CSharpPrinter):
+        return "cs"
+    if isinstance(printer, protocol_python_printer.PythonPrinter):
+        return "py"
+    raise NotImplementedError()
+
+
+def report(printer):
+    """Reports of all files printed by printer, module files first."""
+    backend = _backend(printer)
+    reports = []
+    headers = [(x, y, z, False) for x, y, z in printer.module_contents()]
+    sources = [(x, y, z, True) for x, y, z in printer.extra_contents()]
+    for module, file_name, content, source in headers + sources:
+        module_report = ModuleReport(backend, module.name if module is not None else None, file_name, content)
+        if backend == "cpp" and module is None:
+            # Unity file only includes module sources, which are reported on their own
+            pass
+        elif backend == "cpp":
+            counter = CppCoderCounter(printer, module, source)
+            module_report.instantiations = len(counter.instantiations)
+            module_report.object_size = FUNCTION_BYTES * module_report.functions + CODED_BYTE_BYTES * counter.coded_bytes
+        elif backend == "c":
+            module_report.object_size = FUNCTION_BYTES * module_report.functions
+        elif backend == "py":
+            module_report.object_size = len(marshal.dumps(compile(content, file_name, "exec")))
+        reports.append(module_report)
+    return reports
+
+
+def time_compilation(reports, output_dir, compilers=None):
+    """Compiles every printed C and C++ file alone from output_dir and stores wall time in its report."""
+    if compilers is None:
+        compilers = {
+            "c": [os.environ.get("CC", "cc"), "-std=c99", "-O2", "-x", "c"],
+            "cpp": [os.environ.get("CXX", "c++"), "-std=c++17", "-O2", "-x", "c++"],
+        }
+    with tempfile.TemporaryDirectory() as directory:
+        for module_report in [x for x in reports if x.backend in compilers]:
+            source = os.path.join(directory, "report.src")
+            with open(source, "w") as file:
+                file.write("#include \"{}\"\n".format(module_report.file_name))
+            command = compilers[module_report.backend] + ["-I", os.path.abspath(output_dir), "-c", source,
+                                                          "-o", os.path.join(directory, "report.o")]
+            start = time.perf_counter()
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            module_report.compile_time = time.perf_counter() - start
+            if result.returncode != 0:
+                raise RuntimeError("Compilation of {} failed:\n{}".format(
+                    module_report.file_name, result.stdout.decode(errors="replace")))
+
+
+def format_reports(reports):
+    def cell(value, format="{}"):
+        return "-" if value is None else format.format(value)
+
+    lines = ["{:<8}{:<40}{:>8}{:>11}{:>16}{:>13}{:>12}".format(
+        "backend", "file", "lines", "functions", "instantiations", "object size", "compile s")]
+    for x in reports:
+        lines.append("{:<8}{:<40}{:>8}{:>11}{:>16}{:>13}{:>12}".format(
+            x.backend, x.file_name, x.lines, x.functions, cell(x.instantiations),
+            cell(x.object_size), cell(x.compile_time, "{:.3f}")))
+    return "\n".join(lines)
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+
+class ResolutionError(ValueError):
+    pass
+
+
+class SymbolTable(object):
+    """Index of all modules reachable from given ones through imports, built once per protocol.
+
+    Modules are ordered so that every module comes after modules it imports.
+    Every reference is checked to point to an existing symbol of its own or an imported module,
+    and resolved node is memoized, so printers look references up in constant time.
+    """
+
+    def __init__(self, modules):
+        self.modules = OrderedDict()
+        self.symbols = {}
+        self.owners = {}
+        self.resolved = {}
+        for module in modules:
+            self._add_module(module, [])
+        for module in self.modules.values():
+            for element in module.values():
+                element.visit(self, module)
+
+    def _add_module(self, module, path):
+        # Modules compare by content, so identity is checked explicitly
+        starts = [i for i, x in enumerate(path) if x is module]
+        if len(starts) > 0:
+            cycle = path[starts[0]:] + [module]
+            raise ResolutionError("Import cycle: {}".format(" -> ".join([x.name for x in cycle])))
+        if module.name in self.modules:
+            if self.modules[module.name] is not module:
+                raise ResolutionError("Two different modules named {}".format(module.name))
+            return
+        for imported in module.imports:
+            self._add_module(imported, path + [module])
+        self.modules[module.name] = module
+        for name, element in module.items():
+            self.symbols[(module.name, name)] = element
+            self.owners[id(element)] = module.name
+        self.owners[id(module)] = module.name
+
+    def resolve(self, reference, module_name=None):
+        """Node reference points to; module_name is module containing reference."""
+        key = id(reference)
+        if key in self.resolved:
+            return self.resolved[key]
+        referred_module = reference.referred_module if reference.referred_module is not None else module_name
+        try:
+            return self.symbols[(referred_module, reference.referred_name)]
+        except KeyError:
+            raise ResolutionError("{}: dangling reference to {}.{}".format(
+                module_name, referred_module, reference.referred_name))
+
+    def ordered(self, modules):
+        """Given modules in import order."""
+        names = set([x.name for x in modules])
+        return [x for x in self.modules.values() if x.name in names]
+
+    def _visit_value(self, value, module):
+        if hasattr(value, "visit"):
+            value.visit(self, module)
+
+    def visit_reference(self, reference, module):
+        referred_module = reference.referred_module if reference.referred_module is not None else module.name
+        if referred_module != module.name and referred_module not in [x.name for x in module.imports]:
+            raise ResolutionError("{}: reference to {}.{} from module that is not imported".format(
+                module.name, referred_module, reference.referred_name))
+        self.resolved[id(reference)] = self.resolve(reference, module.name)
+
+    def visit_array(self, type, module):
+        type.internal_type.visit(self, module)
+        self._visit_value(type.size, module)
+
+    def visit_pointer(self, type, module):
+        type.internal_type.visit(self, module)
+
+    def visit_type_alias(self, type, module):
+        type.type.visit(self, module)
+
+    def visit_constant(self, type, module):
+        type.type.visit(self, module)
+
+    def visit_field(self, field, module):
+        field.type.visit(self, module)
+        self._visit_value(field.value, module)
+
+    def visit_structure(self, type, module):
+        for field in type.values():
+            field.visit(self, module)
+
+    def visit_layer(self, layer, module):
+        layer.type.visit(self, module)
+        self._visit_value(layer.value, module)
+
+    def visit_encapsulation(self, type, module):
+        for layer in type.layers:
+            layer.visit(self, module)
@@ -35,6 +35,12 @@ class PackedAttribute(Attribute):
     pass
 
 
+# Structure coded often enough to keep its coders inline when others are generated out of line
+@visitable("hot_attribute")
+class HotAttribute(Attribute):
+    pass
+
+
 @visitable("partbyte")
 class partbyte(Type):
     def __init__(self, format="dec"):
@@ -159,6 +165,63 @@ class Constant(Object):
         self.name = ""
 
 
+@visitable("enum")
+class Enum(Object, OrderedDict):
+    """Group of named values: name -> value.
+
+    Values are given explicitly or, with prefix, taken from module constants named "<prefix>_<name>"
+    defined before the enum is added to module. Then type defaults to type of those constants.
+    """
+
+    def __init__(self, type=None, values=None, prefix=None):
+        super(Enum, self).__init__()
+        assert values is None or prefix is None
+        self.type = type
+        self.prefix = prefix
+        self.name = ""
+        if values is not None:
+            for name, value in (values.items() if hasattr(values, "items") else values):
+                OrderedDict.__setitem__(self, name, value)
+
+    def collect(self, module):
+        for name, element in module.items():
+            if isinstance(element, Constant) and name.startswith(self.prefix + "_"):
+                member = name[len(self.prefix) + 1:]
+                if not member.isidentifier():
+                    raise ValueError("{}.{}: enum member name {} made from constant is not an identifier".format(
+                        module.name, name, member))
+                OrderedDict.__setitem__(self, member, element.value)
+                if self.type is None:
+                    self.type = element.type
+        assert len(self) > 0, "No constants with prefix {}".format(self.prefix)
+
+
+@visitable("layer")
+class Layer(object):
+    """Structure in encapsulation, selected by value of field in preceding layer (if field is given)."""
+
+    def __init__(self, name, type, field=None, value=None):
+        assert isinstance(type, Reference)
+        assert (field is None) == (value is None)
+        self.name = name
+        self.type = type
+        self.field = field
+        self.value = value
+
+
+@visitable("encapsulation")
+class Encapsulation(Object):
+    """Stack of layers, outermost first, each carried right after the preceding one."""
+
+    def __init__(self, layers):
+        assert len(layers) > 0
+        assert layers[0].field is None, "First layer has no preceding layer to select it"
+        assert len(set([x.name for x in layers])) == len(layers)
+        assert "payload" not in [x.name for x in layers]
+        self.layers = layers
+        self.name = ""
+
+
 @visitable("line_comment")
 class LineComment(Object):
     def __init__(self, text):
@@ -177,11 +240,18 @@ class Line(Object):
         self.text = text
 
 
+# Wire byte orders; module or protocol without one has coders for both native and big endian
+LittleEndian = "little"
+BigEndian = "big"
+
+
 @visitable("module")
 class Module(OrderedDict):
-    def __init__(self, name):
+    def __init__(self, name, wire_endianness=None):
         super(Module, self).__init__()
+        assert wire_endianness in (None, LittleEndian, BigEndian)
         self.name = name
+        self.wire_endianness = wire_endianness
         self.imports = []
         self.__unique_counter = 0
 
@@ -196,6 +266,8 @@ class Module(OrderedDict):
         if key == "":
             key = self.__internal_name()
 
+        if isinstance(value, Enum) and value.prefix is not None and len(value) == 0:
+            value.collect(self)
         value.name = key
         OrderedDict.__setitem__(self, key, value)
 
@@ -210,9 +282,12 @@ class Module(OrderedDict):
 
 
 class Protocol(object):
-    def __init__(self, name, modules = None):
+    # wire_endianness is used for modules that do not declare their own
+    def __init__(self, name, modules = None, wire_endianness = None):
+        assert wire_endianness in (None, LittleEndian, BigEndian)
         self.name = name
         self.modules = modules if modules is not None else []
+        self.wire_endianness = wire_endianness
 
     def add_module(self, module):
         assert isinstance(module, Module)
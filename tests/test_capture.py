@@ -0,0 +1,73 @@
+from ethernet.codecs import Ethernet, ARP
+from ethernet import capture
+
+import struct
+
+import pytest
+
+
+def ethernet_frame(ether_type, payload=b""):
+    buffer = bytearray(Ethernet.Header.wireSize)
+    Ethernet.Header(bytes([1, 2, 3, 4, 5, 6]), bytes([6, 5, 4, 3, 2, 1]), ether_type).encode(buffer)
+    return bytes(buffer) + payload
+
+
+def arp_frame(operation, sender, target):
+    buffer = bytearray(ARP.Header.wireSize)
+    ARP.Header(operation=operation, senderProtocolAddress=sender, targetProtocolAddress=target).encode(buffer)
+    return ethernet_frame(Ethernet.etherType_ARP, bytes(buffer))
+
+
+def frames():
+    result = []
+    for i in range(300):
+        sender, target = bytes([10, 0, 0, i % 20]), bytes([10, 0, 1, i % 7])
+        result.append(arp_frame(ARP.operation_request, sender, target))
+        if i % 3 == 0:
+            result.append(arp_frame(ARP.operation_reply, target, sender))
+        result.append(ethernet_frame(Ethernet.etherType_IPv4, bytes(i % 50)))
+        # Payload looking like records makes resync of some chunks stop at wrong offset
+        fake_records = b"".join([struct.pack("<IIII", i, 0, 4, 4) + b"fake" for _ in range(i % 10)])
+        result.append(ethernet_frame(Ethernet.etherType_IPv4, fake_records))
+    result.append(bytes(5))
+    return result
+
+
+def summaries(path):
+    return [capture.summarize(str(path), workers=1), capture.summarize(str(path), workers=2, chunks_per_worker=50)]
+
+
+def test_parallel_summary_equals_serial(tmp_path):
+    path = tmp_path / "capture.pcap"
+    capture.write_pcap(str(path), frames())
+    serial, parallel = summaries(path)
+
+    assert serial.frames == 300 + 100 + 300 + 300 + 1
+    assert serial.truncated == 1
+    assert serial.arp_pairs() == 100
+    for summary in [serial, parallel]:
+        assert summary.unanswered_arp_requests() == 200
+    for name in ["frames", "truncated", "ether_types", "arp_operations", "arp_requests", "arp_replies"]:
+        assert getattr(parallel, name) == getattr(serial, name)
+
+
+def test_chunks_follow_each_other():
+    assert capture.split_chunks(124, 3) == [(24, 58), (58, 92), (92, 124)]
+    assert capture.split_chunks(26, 4) == [(24, 25), (25, 26)]
+
+
+def test_capture_without_records(tmp_path):
+    path = tmp_path / "capture.pcap"
+    capture.write_pcap(str(path), [])
+    for summary in summaries(path):
+        assert summary.frames == 0
+
+
+def test_link_type_must_be_ethernet(tmp_path):
+    path = tmp_path / "capture.pcap"
+    capture.write_pcap(str(path), [ethernet_frame(Ethernet.etherType_IPv4)])
+    with open(str(path), "r+b") as file:
+        file.seek(20)
+        file.write(struct.pack("<I", 101))
+    with pytest.raises(ValueError, match="link type 101 is not Ethernet"):
+        capture.summarize(str(path), workers=2)
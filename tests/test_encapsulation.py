@@ -0,0 +1,109 @@
+from ethernet.codecs import Ethernet, ARP, ethernet_protocol
+from printers import protocol_c_printer
+from printers import protocol_cpp_printer
+from printers import protocol_types as types
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+
+def arp_frame(ether_type=Ethernet.etherType_ARP):
+    buffer = bytearray(Ethernet.Header.wireSize + ARP.Header.wireSize + 4)
+    Ethernet.Header(bytes([1, 2, 3, 4, 5, 6]), bytes([6, 5, 4, 3, 2, 1]), ether_type).encode(buffer)
+    ARP.Header(operation=ARP.operation_reply, senderProtocolAddress=bytes([10, 0, 0, 1]),
+               targetProtocolAddress=bytes([10, 0, 0, 2])).encode(buffer, Ethernet.Header.wireSize)
+    return bytes(buffer)
+
+
+def byte_array(name, data):
+    return "static const unsigned char {}[{}] = {{ {} }};\n".format(name, len(data), ", ".join([str(x) for x in data]))
+
+
+def run(work_dir, compiler, flags, source_name, source):
+    source_path = os.path.join(str(work_dir), source_name)
+    with open(source_path, "w") as file:
+        file.write(source)
+    binary = os.path.join(str(work_dir), "frame_test")
+    subprocess.check_call([compiler] + flags + ["-o", binary, source_path], cwd=str(work_dir))
+    return subprocess.check_output([binary]).decode().split()
+
+
+# Each driver prints: parse result, arp and payload offsets, fields of decoded ARP header,
+# then parse results of truncated frame and of frame with other etherType
+C_DRIVER = """
+#include "EthernetProtocol_ARP.h"
+#include <stdio.h>
+
+int main(void)
+{
+    ARP_Frame layers;
+    int ok = ARP_Frame_parse(&layers, frame, sizeof(frame));
+    /* Arrays of partbyte are reversed on big endian wire */
+    const unsigned char* sender = frame + layers.arp + 14;
+    printf("%d %d %d %d %d.%d.%d.%d ", ok, layers.arp, layers.payload,
+           (frame[layers.arp + 6] << 8) | frame[layers.arp + 7], sender[3], sender[2], sender[1], sender[0]);
+    printf("%d %d\\n", ARP_Frame_parse(&layers, frame, ARP_Frame_wireSize - 1),
+           ARP_Frame_parse(&layers, ipv4, sizeof(ipv4)));
+    return 0;
+}
+"""
+
+CPP_DRIVER = """
+#include "EthernetProtocol_ARP.hpp"
+#include <cstdio>
+
+using namespace EthernetProtocol;
+
+int main()
+{
+    ARP::Frame layers{};
+    bool ok = ARP::parse(layers, frame, sizeof(frame));
+    ARP::Header header{};
+    ARP::decode(header, frame + layers.arp);
+    const auto& sender = header.senderProtocolAddress;
+    std::printf("%d %d %d %d %d.%d.%d.%d ", ok, layers.arp, layers.payload, header.operation,
+                sender[0], sender[1], sender[2], sender[3]);
+    std::printf("%d %d\\n", ARP::parse(layers, frame, ARP::Frame::wireSize - 1), ARP::parse(layers, ipv4, sizeof(ipv4)));
+}
+"""
+
+EXPECTED = ["1", "14", "42", str(ARP.operation_reply), "10.0.0.1", "0", "0"]
+
+
+def frames():
+    return byte_array("frame", arp_frame()) + byte_array("ipv4", arp_frame(Ethernet.etherType_IPv4))
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C compiler not found")
+def test_c_parse_round_trip(tmp_path):
+    protocol_c_printer.CPrinter(ethernet_protocol).print_to_file(str(tmp_path))
+    # Offsets must not depend on in-memory layout of structures
+    output = run(tmp_path, "cc", ["-std=c99", "-DPACKED="], "frame_test.c",
+                 C_DRIVER.replace("#include <stdio.h>\n", "#include <stdio.h>\n\n" + frames()))
+    assert output == EXPECTED
+
+
+@pytest.mark.skipif(shutil.which("c++") is None, reason="C++ compiler not found")
+def test_cpp_parse_round_trip(tmp_path):
+    protocol_cpp_printer.CppPrinter(ethernet_protocol).print_to_file(str(tmp_path))
+    shutil.copyfile(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "codec", "codec.hpp"),
+                    os.path.join(str(tmp_path), "codec.hpp"))
+    output = run(tmp_path, "c++", ["-std=c++17"], "frame_test.cpp",
+                 CPP_DRIVER.replace("#include <cstdio>\n", "#include <cstdio>\n\n" + frames()))
+    assert output == EXPECTED
+
+
+def test_selector_must_be_plain_scalar():
+    module = types.Module("Test")
+    module["Address"] = types.TypeAlias(types.Array(types.uint8(), 4))
+    module["Outer"] = types.Structure(fields=[types.Field("kind", types.Reference("Address", module))])
+    module["Inner"] = types.Structure(fields=[types.Field("value", types.uint16())])
+    module["Frame"] = types.Encapsulation([
+        types.Layer("outer", types.Reference("Outer", module)),
+        types.Layer("inner", types.Reference("Inner", module), "kind", 1),
+    ])
+    with pytest.raises(ValueError, match="Test.Frame.inner: selector field kind is not a plain scalar"):
+        protocol_c_printer.CPrinter(types.Protocol("Test", [module]))
@@ -0,0 +1,11 @@
+import fuzz_backends
+
+import pytest
+
+
+def test_backends_agree_with_reference_encoder():
+    backends = [x() for x in fuzz_backends.BACKENDS]
+    if not any([x.available() for x in backends if x.name in ("c", "cpp")]):
+        pytest.skip("C and C++ compilers not found")
+    errors = fuzz_backends.fuzz("regression", 4, [x for x in backends if x.available()])
+    assert errors == []
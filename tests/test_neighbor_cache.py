@@ -0,0 +1,24 @@
+from ethernet.neighbor_cache import NeighborCache
+
+
+def clock():
+    return 0.0
+
+
+def test_least_recently_updated_entry_is_evicted():
+    cache = NeighborCache(2, ttl=10, clock=clock)
+    cache.update(bytes([10, 0, 0, 1]), bytes([1, 1, 1, 1, 1, 1]))
+    cache.update(bytes([10, 0, 0, 2]), bytes([2, 2, 2, 2, 2, 2]))
+    cache.update(bytes([10, 0, 0, 1]), bytes([3, 3, 3, 3, 3, 3]))
+    cache.update(bytes([10, 0, 0, 3]), bytes([4, 4, 4, 4, 4, 4]))
+    assert len(cache) == 2
+    assert cache.lookup(bytes([10, 0, 0, 1])) == bytes([3, 3, 3, 3, 3, 3])
+    assert cache.lookup(bytes([10, 0, 0, 2])) is None
+    assert cache.lookup(bytes([10, 0, 0, 1]), now=10.0) is None
+
+
+def test_cache_without_capacity_keeps_nothing():
+    cache = NeighborCache(0, ttl=10, clock=clock)
+    cache.update(bytes([10, 0, 0, 1]), bytes([1, 1, 1, 1, 1, 1]))
+    assert len(cache) == 0
+    assert cache.lookup(bytes([10, 0, 0, 1])) is None
@@ -0,0 +1,117 @@
+from ethernet.codecs import Ethernet, ARP
+from ethernet import pipeline
+
+import asyncio
+import socket
+
+import pytest
+
+
+def ethernet_frame(ether_type, payload=b""):
+    buffer = bytearray(Ethernet.Header.wireSize)
+    Ethernet.Header(bytes([1, 2, 3, 4, 5, 6]), bytes([6, 5, 4, 3, 2, 1]), ether_type).encode(buffer)
+    return bytes(buffer) + payload
+
+
+def arp_frame(operation):
+    buffer = bytearray(ARP.Header.wireSize)
+    ARP.Header(operation=operation, senderProtocolAddress=bytes([10, 0, 0, 1]),
+               targetProtocolAddress=bytes([10, 0, 0, 2])).encode(buffer)
+    return ethernet_frame(Ethernet.etherType_ARP, bytes(buffer))
+
+
+def collect(pipe):
+    received = {"requests": [], "ipv4": [], "default": []}
+
+    async def on_requests(frames):
+        received["requests"] += frames
+
+    async def on_ipv4(frames):
+        received["ipv4"] += frames
+
+    async def on_default(frames):
+        received["default"] += frames
+
+    pipe.on_arp(ARP.operation_request, on_requests)
+    pipe.on_ether_type(Ethernet.etherType_IPv4, on_ipv4)
+    pipe.on_default(on_default)
+    return received
+
+
+def test_socketpair_round_trip():
+    frames = [arp_frame(ARP.operation_request), ethernet_frame(Ethernet.etherType_IPv4, b"payload"),
+              arp_frame(ARP.operation_reply), b"short"] * 10
+
+    async def main():
+        sender, receiver = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        with sender, receiver:
+            receiver.setblocking(False)
+            pipe = pipeline.FramePipeline(batch_size=8, batch_timeout=0.01)
+            received = collect(pipe)
+            for frame in frames:
+                sender.send(frame)
+            # Empty datagram ends socket source
+            sender.send(b"")
+            stats = await asyncio.wait_for(pipe.run(pipeline.socket_frames(receiver)), 5)
+        return received, stats
+
+    received, stats = asyncio.run(main())
+    assert stats.frames == 40
+    assert stats.truncated == 10
+    assert stats.unhandled == 0
+    assert [x.operation for _, x in received["requests"]] == [ARP.operation_request] * 10
+    assert all([x.senderProtocolAddress == bytes([10, 0, 0, 1]) for _, x in received["requests"]])
+    assert [frame for _, frame in received["ipv4"]] == [frames[1]] * 10
+    # Replies have no ARP handler, so they go to default handler of their etherType
+    assert [header.typeOrLength for header, _ in received["default"]] == [Ethernet.etherType_ARP] * 10
+
+
+def test_partial_batch_is_flushed_when_source_is_idle():
+    async def source(flushed):
+        yield arp_frame(ARP.operation_request)
+        await asyncio.wait_for(flushed.wait(), 5)
+
+    async def main():
+        flushed = asyncio.Event()
+        pipe = pipeline.FramePipeline(batch_size=64, batch_timeout=0.01)
+
+        async def on_requests(frames):
+            flushed.set()
+
+        pipe.on_arp(ARP.operation_request, on_requests)
+        return await pipe.run(source(flushed))
+
+    assert asyncio.run(main()).batches == 1
+
+
+def test_cancelled_run_cancels_pending_read():
+    async def main():
+        receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        with sender, receiver:
+            receiver.setblocking(False)
+            run = asyncio.ensure_future(pipeline.FramePipeline().run(pipeline.socket_frames(receiver)))
+            await asyncio.sleep(0.05)
+            run.cancel()
+            try:
+                await run
+            except asyncio.CancelledError:
+                pass
+            await asyncio.sleep(0)
+            return [x for x in asyncio.all_tasks() if x is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+
+
+def test_source_error_is_raised_after_read_frames_are_handled():
+    async def source():
+        yield arp_frame(ARP.operation_request)
+        raise OSError("Network is down")
+
+    async def main():
+        pipe = pipeline.FramePipeline(batch_size=64, batch_timeout=1)
+        received = collect(pipe)
+        with pytest.raises(OSError, match="Network is down"):
+            await asyncio.wait_for(pipe.run(source()), 2)
+        return received
+
+    assert len(asyncio.run(main())["requests"]) == 1
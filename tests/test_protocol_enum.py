@@ -0,0 +1,11 @@
+from printers import protocol_types as types
+
+import pytest
+
+
+def test_enum_member_names_must_be_identifiers():
+    module = types.Module("Ethernet")
+    module["etherType_IPv4"] = types.Constant(0x0800, types.uint16("hex"))
+    module["etherType_802_1Q"] = types.Constant(0x8100, types.uint16("hex"))
+    with pytest.raises(ValueError, match="Ethernet.etherType_802_1Q: enum member name 802_1Q"):
+        module["EtherType"] = types.Enum(prefix="etherType")
@@ -0,0 +1,38 @@
+from printers import protocol_hash
+from printers import protocol_printer
+from printers import protocol_resolution
+from printers import protocol_types as types
+
+import ethernet.ethernet as ethernet
+
+
+def hashes(protocol_endianness):
+    protocol = types.Protocol("EthernetProtocol", [ethernet.Ethernet], wire_endianness=protocol_endianness)
+    hasher = protocol_printer.ProtocolPrinter(protocol).layout_hasher
+    return hasher.hash(ethernet.Ethernet), hasher.hash(ethernet.Ethernet["Header"])
+
+
+def test_protocol_endianness_changes_module_and_structure_hashes():
+    results = [hashes(x) for x in [None, types.BigEndian, types.LittleEndian]]
+    assert len(set([module for module, _ in results])) == 3
+    assert len(set([structure for _, structure in results])) == 3
+
+
+def test_module_endianness_overrides_protocol_endianness():
+    module = types.Module("Module", types.BigEndian)
+    module["Structure"] = types.Structure(fields=[types.Field("value", types.uint16())])
+    symbols = protocol_resolution.SymbolTable([module])
+    big = protocol_hash.LayoutHasher(symbols, types.BigEndian).hash(module["Structure"])
+    assert protocol_hash.LayoutHasher(symbols, types.LittleEndian).hash(module["Structure"]) == big
+    assert protocol_hash.LayoutHasher(symbols).hash(module["Structure"]) == big
+
+
+def test_diff_reports_endianness_change():
+    def module(wire_endianness):
+        result = types.Module("Module", wire_endianness)
+        result["Structure"] = types.Structure(fields=[types.Field("value", types.uint16())])
+        return result
+
+    assert protocol_hash.diff_modules(module(types.BigEndian), module(types.LittleEndian)) == [
+        "Module: wire endianness changed from big to little"]
+    assert protocol_hash.diff_modules(module(None), module(types.BigEndian), types.BigEndian) == []
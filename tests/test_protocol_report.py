@@ -0,0 +1,27 @@
+from printers import protocol_cpp_printer
+from printers import protocol_report
+from printers import protocol_types as types
+
+import ethernet.arp as arp
+import ethernet.ethernet as ethernet
+
+
+def test_out_of_line_sources_are_reported():
+    protocol = types.Protocol("EthernetProtocol", [ethernet.Ethernet, arp.ARP], wire_endianness=types.BigEndian)
+    reports = protocol_report.report(protocol_cpp_printer.CppPrinter(protocol, out_of_line=True, unity=True))
+    by_file = dict([(x.file_name, x) for x in reports])
+
+    # Ethernet has only hot structures, so it has no source file
+    assert sorted(by_file.keys()) == [
+        "EthernetProtocol.cpp", "EthernetProtocol_ARP.cpp", "EthernetProtocol_ARP.hpp", "EthernetProtocol_Ethernet.hpp"]
+    assert by_file["EthernetProtocol_ARP.cpp"].functions == 2
+    assert by_file["EthernetProtocol_ARP.cpp"].object_size > 0
+    assert by_file["EthernetProtocol.cpp"].module is None
+
+
+def test_unity_file_does_not_collide_with_module_named_unity():
+    module = types.Module("unity")
+    module["Structure"] = types.Structure(fields=[types.Field("value", types.uint16())])
+    printer = protocol_cpp_printer.CppPrinter(types.Protocol("Test", [module]), out_of_line=True, unity=True)
+    file_names = [x for _, x, _ in printer.module_contents() + printer.extra_contents()]
+    assert len(set(file_names)) == len(file_names) == 3
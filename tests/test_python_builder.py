@@ -0,0 +1,60 @@
+from printers import protocol_python_printer
+from printers import protocol_types as types
+
+import pytest
+
+
+def builder_module():
+    module = types.Module("Builder")
+    # Field names equal to builder parameters, also with their underscore prefix
+    module["Record"] = types.Structure(fields=[
+        types.Field("cls", types.uint8()),
+        types.Field("_template", types.uint8()),
+        types.Field("buffer", types.uint16()),
+        types.Field("offset", types.uint16()),
+        types.Field("count", types.uint32()),
+        types.Field("stride", types.uint8()),
+        types.Field("_buffer", types.uint8()),
+        types.Field("values", types.uint8()),
+    ])
+    protocol = types.Protocol("Test", [module], wire_endianness=types.BigEndian)
+    return protocol_python_printer.PythonPrinter(protocol).load()["Builder"]
+
+
+def test_fields_named_like_builder_parameters():
+    Record = builder_module().Record
+    template = Record.template(cls=1, values=2)
+    buffer = bytearray(4 + Record.wireSize)
+    end = Record.build(template, buffer, 4, _template=3, buffer=4, offset=5, count=6, stride=7, _buffer=8)
+
+    assert end == 4 + Record.wireSize
+    assert Record.decode(buffer, 4) == Record(1, 3, 4, 5, 6, 7, 8, 2)
+
+
+def test_build_rejects_template_of_other_length():
+    Record = builder_module().Record
+    buffer = bytearray(2 * Record.wireSize)
+    with pytest.raises(ValueError):
+        Record.build(Record.template() + b"\x00", buffer)
+    with pytest.raises(ValueError):
+        Record.build(Record.template()[1:], buffer)
+    assert len(buffer) == 2 * Record.wireSize
+
+
+def test_build_array_columns_named_like_parameters():
+    numpy = pytest.importorskip("numpy")
+    Record = builder_module().Record
+    buffer = bytearray(3 * Record.wireSize)
+    count = numpy.array([10, 20, 30], numpy.uint32)
+    Record.build_array(Record.template(stride=9), buffer, 3, count=count, offset=numpy.array([1, 2, 3]))
+
+    assert [Record.decode(buffer, i * Record.wireSize).count for i in range(3)] == [10, 20, 30]
+    assert [Record.decode(buffer, i * Record.wireSize).offset for i in range(3)] == [1, 2, 3]
+    assert Record.decode(buffer).stride == 9
+
+
+def test_fields_named_like_class_members_are_rejected():
+    module = types.Module("Builder")
+    module["Record"] = types.Structure(fields=[types.Field("template", types.uint8())])
+    with pytest.raises(ValueError, match="template"):
+        protocol_python_printer.PythonPrinter(types.Protocol("Test", [module])).load()